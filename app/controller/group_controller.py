@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, Response, status, Query
 from typing import List
 from app.core.security import user_context, authorization
 from app.schema.group_schema import GroupCreate, GroupUpdate, GroupRead
@@ -15,20 +15,25 @@ group_service = GroupService()
 
 @router.get("", response_model=List[GroupRead])
 async def list_groups(
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
+    cursor: str | None = Query(None, description="Cursor của trang sau (header X-Next-Cursor); khi có cursor thì bỏ qua page"),
 ):
     """
     Lấy danh sách các nhóm theo phân trang.
     Yêu cầu user phải tồn tại và có quyền "view_groups".
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "view_groups"):
         raise HTTPException(status_code=403, detail="You have no access to this resource")
 
-    return await group_service.get_paginated_groups(page, limit)
+    groups, next_cursor = await group_service.get_paginated_groups(page, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return groups
 
 
 @router.get("/{id}", response_model=GroupRead)
@@ -46,7 +51,7 @@ async def create_group(group: GroupCreate):
     Tạo nhóm mới.
     Yêu cầu user phải tồn tại và có quyền "create_group".
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "create_group"):
@@ -61,7 +66,7 @@ async def update_group(id: int, group_update: GroupUpdate):
     Cập nhật thông tin của group.
     Yêu cầu user phải tồn tại và có quyền "edit_group" cho group có id được chỉ định.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "edit_group", id):
@@ -76,7 +81,7 @@ async def delete_group(id: int):
     Xóa group.
     Yêu cầu user phải tồn tại và có quyền "delete_group" cho group có id được chỉ định.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "delete_group", id):
@@ -18,7 +18,7 @@ async def add_user_to_group(data: GroupMemberCreate):
     """
     Thêm user vào group.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if user_current is None:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "manage_group_members"):
@@ -30,7 +30,7 @@ async def remove_user_from_group(data: GroupMemberBase):
     """
     Xóa user khỏi group.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if user_current is None:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "manage_group_members"):
@@ -48,7 +48,7 @@ async def get_groups_for_user_current():
     Lấy danh sách các group mà user hiện tại thuộc về.
     Yêu cầu: Người dùng phải đang đăng nhập".
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     return  await group_member_service.find_groups_by_user(user_current)
@@ -60,7 +60,7 @@ async def get_groups_for_user(id: int):
     Lấy danh sách các group mà user có id được chỉ định thuộc về.
     Yêu cầu: Người dùng hiện tại phải đăng nhập và có quyền "view_group_details".
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "view_group_details"):
@@ -75,7 +75,7 @@ async def get_users_in_group(id: int):
     Lấy danh sách các user thuộc group có id được chỉ định.
     Yêu cầu: Người dùng hiện tại phải tồn tại và có quyền "view_group_details".
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "view_group_details"):
@@ -92,7 +92,7 @@ async def is_user_in_group(data: GroupMemberBase):
       - Người dùng hiện tại phải tồn tại và có quyền "view_group_details".
       - Dữ liệu JSON chứa 'userId' và 'groupId'.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "view_group_details"):
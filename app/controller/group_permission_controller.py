@@ -20,7 +20,7 @@ async def get_permissions_by_group(group_id: int):
     """
     Lấy danh sách quyền của Group.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     
@@ -37,7 +37,7 @@ async def assign_permission(payload: GroupPermissionsAssign):
     """
     Gán (assign) danh sách quyền cho Group.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     
@@ -53,7 +53,7 @@ async def update_permission(payload: GroupPermissionsUpdate):
     """
     Cập nhật quyền của Group.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     
@@ -69,7 +69,7 @@ async def delete_permission(payload: GroupPermissionsDelete):
     """
     Xóa danh sách quyền của Group.
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException
+from app.core.security import user_context, authorization
+from app.core.password import password_hasher
+from app.core.database import engine, read_engine
+from app.service.authentication_service import token_cache
+from app.service.blacklist_token_service import blacklist_filter
+from app.service.product_service import suggest_cache
+
+
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+async def require_admin_dashboard():
+    """Các endpoint nội bộ yêu cầu đăng nhập và quyền "access_admin_dashboard"."""
+    user_current = await user_context.get()
+    if not user_current:
+        raise HTTPException(status_code=401, detail="You have not logged in")
+    if not await authorization.check_permission(user_current, "access_admin_dashboard"):
+        raise HTTPException(status_code=403, detail="You have no access to this resource")
+
+
+@router.get("/token-cache")
+async def get_token_cache_stats():
+    """
+    Thống kê cache token đã xác thực của worker hiện tại (kích thước, hit/miss).
+    """
+    await require_admin_dashboard()
+    return token_cache.stats()
+
+
+@router.get("/blacklist-filter")
+async def get_blacklist_filter_stats():
+    """
+    Thống kê bloom filter của blacklist token (số bucket, số phần tử, bộ nhớ).
+    """
+    await require_admin_dashboard()
+    return blacklist_filter.stats()
+
+
+@router.get("/suggest-cache")
+async def get_suggest_cache_stats():
+    """
+    Thống kê cache gợi ý tên sản phẩm của worker hiện tại (kích thước, hit/miss).
+    """
+    await require_admin_dashboard()
+    return suggest_cache.stats()
+
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats():
+    """
+    Thống kê thread pool băm mật khẩu (độ dài hàng đợi, thời gian băm).
+    """
+    await require_admin_dashboard()
+    return password_hasher.stats()
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """
+    Thống kê connection pool của worker hiện tại (connection đang dùng, vượt mức, thời gian chờ)
+    cho primary và read replica (None nếu không cấu hình replica).
+    """
+    await require_admin_dashboard()
+    return {
+        "primary": engine.pool.stats(),
+        "replica": read_engine.pool.stats() if read_engine is not engine else None,
+    }
@@ -18,7 +18,7 @@ async def list_permissions():
       - Người dùng cần đăng nhập.
       - Người dùng có quyền "view_permissions".
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "view_permissions"):
@@ -1,20 +1,31 @@
-from fastapi import APIRouter, HTTPException, Request, status, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response, status, Query
+from typing import List, Literal
 from app.service.product_service import ProductService
-# from app.service.authorization_service import AuthorizationService
-# from app.exception import AppException
 from app.schema.product_schema import ProductDto, ProductOptionDto
+from app.core.security import user_context, authorization
 
 router = APIRouter(prefix="/products", tags=["Product"])
 
 product_service = ProductService()
-# authorization_service = AuthorizationService()
+
+
+async def require_permission(permission_name: str, target_id: int | None = None):
+    """Người dùng hiện tại phải đăng nhập và có quyền permission_name (trên target_id nếu có)"""
+    user_current = await user_context.get()
+    if not user_current:
+        raise HTTPException(status_code=401, detail="E2025")
+    if not await authorization.check_permission(user_current, permission_name, target_id):
+        raise HTTPException(status_code=403, detail="E2021")
+    return user_current
 
 
 @router.get("", response_model=List[ProductDto])
 async def list_products(
+    response: Response,
     page: int = Query(1, ge=1),
-    limit: int = Query(10, ge=1)
+    limit: int = Query(10, ge=1),
+    cursor: str | None = Query(None, description="Cursor của trang sau (header X-Next-Cursor); khi có cursor thì bỏ qua page"),
+    sort: Literal["id", "price"] = Query("id", description="Sắp xếp theo id hoặc theo giá thấp nhất (tăng dần)"),
 ):
     """
     Lấy danh sách sản phẩm theo phân trang.
@@ -23,7 +34,48 @@ async def list_products(
     """
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="Invalid pagination parameters")
-    products = await product_service.get_paginated_product_dtos(page, limit)
+    # Khách vãng lai xem toàn bộ; user đăng nhập chỉ thấy các sản phẩm nằm trong phạm vi quyền view_products
+    scope = None
+    user_current = await user_context.get()
+    if user_current:
+        scope = await authorization.get_permission_scope(user_current, "view_products")
+    products, next_cursor = await product_service.get_paginated_product_dtos(page, limit, scope, cursor, sort)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return products
+
+
+@router.get("/suggest")
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Chuỗi người dùng đang nhập"),
+    limit: int = Query(10, ge=1, le=20),
+):
+    """
+    Gợi ý tên sản phẩm (autocomplete) cho chuỗi đang nhập, chấp nhận gõ thiếu hoặc sai chính tả.
+
+    Trả về danh sách `{"id", "name"}`, tên bắt đầu bằng chuỗi được xếp trước.
+    """
+    return await product_service.suggest_product_names(q, limit)
+
+
+@router.get("/search", response_model=List[ProductDto])
+async def search_products(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description='Từ khóa, hỗ trợ "cụm từ", OR và -loại_trừ'),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Tìm kiếm sản phẩm theo tên và mô tả, kết quả xếp theo độ liên quan (tên được ưu tiên hơn mô tả).
+
+    Header X-Total-Count là tổng số sản phẩm khớp; X-Search-Truncated: true khi chỉ các kết quả liên quan nhất
+    (PRODUCT_SEARCH_MAX_CANDIDATES) được phân trang.
+    """
+    products, total, truncated = await product_service.search_products_by_keywords(q, page, limit)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    if truncated:
+        response.headers["X-Search-Truncated"] = "true"
     return products
 
 
@@ -34,11 +86,9 @@ async def detail_product(id: int):
 
     Nếu không tìm thấy sản phẩm, trả về lỗi 404.
     """
-    try:
-        product = await product_service.get_product_dto_by_id(id)
-    except Exception as e:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    # Document JSON được tạo sẵn khi ghi: trả nguyên chuỗi, không dựng DTO hay serialize lại
+    document = await product_service.get_product_document(id)
+    return Response(content=document, media_type="application/json")
 
 
 @router.post("", response_model=ProductDto, status_code=status.HTTP_201_CREATED)
@@ -47,15 +97,11 @@ async def create_product(request: Request):
     Tạo sản phẩm mới.
 
     Yêu cầu:
-      - Thông tin người dùng có trong `request.state.user`.
+      - Người dùng đã đăng nhập.
       - Người dùng có quyền "create_product".
       - Payload JSON chứa các thông tin cần thiết.
     """
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=401, detail="E2025")
-    # if not authorization_service.check_permission(user, "create_product"):
-    #     raise HTTPException(status_code=403, detail="E2021")
+    await require_permission("create_product")
     try:
         data = await request.json()
     except Exception:
@@ -73,14 +119,10 @@ async def update_product(request: Request, id: int):
     Cập nhật thông tin sản phẩm.
 
     Yêu cầu:
-      - Thông tin user có trong `request.state.user`.
+      - Người dùng đã đăng nhập.
       - Người dùng có quyền "edit_product" cho sản phẩm có ID được chỉ định.
     """
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=401, detail="E2025")
-    # if not authorization_service.check_permission(user, "edit_product", id):
-    #     raise HTTPException(status_code=403, detail="E2021")
+    await require_permission("edit_product", id)
     try:
         data = await request.json()
     except Exception:
@@ -98,14 +140,10 @@ async def delete_product(id: int, request: Request):
     Xóa sản phẩm (soft-delete).
 
     Yêu cầu:
-      - Thông tin user có trong `request.state.user`.
-      - Người dùng có quyền "delete_product".
+      - Người dùng đã đăng nhập.
+      - Người dùng có quyền "delete_product" cho sản phẩm đó.
     """
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=401, detail="E2025")
-    # if not authorization_service.check_permission(user, "delete_product"):
-    #     raise HTTPException(status_code=403, detail="E2021")
+    await require_permission("delete_product", id)
     try:
         await product_service.delete_product(id)
         return {"message": "Product deleted"}
@@ -120,7 +158,7 @@ async def get_products_by_category(categoryId: int):
 
     Nếu không tìm thấy sản phẩm nào, trả về lỗi 404.
     """
-    products = await product_service.getProductsByCategoryId(categoryId)
+    products = await product_service.get_product_dtos_by_category_id(categoryId)
     if not products:
         raise HTTPException(status_code=404, detail="No products found for this category")
     return products
@@ -132,15 +170,11 @@ async def update_attributes(request: Request, id: int):
     Cập nhật hoặc tạo mới các thuộc tính và tùy chọn của sản phẩm.
 
     Yêu cầu:
-      - Thông tin user có trong `request.state.user`.
+      - Người dùng đã đăng nhập.
       - Người dùng có quyền "edit_product" cho sản phẩm đó.
       - Payload JSON chứa các thuộc tính cần cập nhật.
     """
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=401, detail="E2025")
-    # if not authorization_service.check_permission(user, "edit_product", id):
-    #     raise HTTPException(status_code=403, detail="E2021")
+    await require_permission("edit_product", id)
     try:
         data = await request.json()
     except Exception:
@@ -176,22 +210,20 @@ async def find_option(request: Request, id: int):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/{id}/option-default")
+@router.get("/{id}/option-default", response_model=ProductOptionDto)
 async def get_option_default(id: int):
     """
     Lấy tùy chọn mặc định của sản phẩm theo ID.
 
     Nếu không tìm thấy sản phẩm, trả về lỗi 404.
     """
-    try:
-        product = await product_service.get_product_by_id(id)
-    except Exception:
+    product = await product_service.get_product_by_id(id)
+    if not product or product.is_delete:
         raise HTTPException(status_code=404, detail="Product not found")
-    try:
-        product_option_default = await product_service.getOptionDefault(product)
-        return product_option_default
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    product_option_default = await product_service.find_option_default(product)
+    if not product_option_default:
+        raise HTTPException(status_code=404, detail="Product has no default option")
+    return product_option_default
 
 
 @router.get("/options/{optionId}")
@@ -201,10 +233,7 @@ async def get_option_values(optionId: int):
 
     Nếu không tìm thấy giá trị nào, trả về lỗi 404.
     """
-    try:
-        values = await product_service.getValuesByOptionId(optionId)
-        if not values:
-            raise HTTPException(status_code=404, detail="No values found for the given option ID")
-        return values
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    values = await product_service.get_values_by_option_id(optionId)
+    if not values:
+        raise HTTPException(status_code=404, detail="No values found for the given option ID")
+    return values
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/login", response_model=TokenResponse)
 async def login(request: LoginRequest):
-    current_user = user_context.get()
+    current_user = await user_context.get()
     if current_user is not None:
         raise HTTPException(status_code=403, detail="You have already logged in")
     access_token, refresh_token = await authentication.login(request)
@@ -36,26 +36,27 @@ async def refresh_token(request: RefreshTokenRequest):
 
 @router.get("/logout", status_code=status.HTTP_200_OK)
 async def logout():
+    payload = await payload_context.get()
     try:
-        await authentication.logout(payload_context.get())
+        await authentication.logout(payload)
         return {"message": "Logout successful"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/change-password", status_code=status.HTTP_200_OK)
 async def change_password(request: ChangePasswordRequest):
-    current_user = user_context.get()
+    current_user = await user_context.get()
     if current_user is None:
         raise HTTPException(status_code=401, detail="You have not logged in")
     try:
-        await user_service.change_user_password(current_user, request.currentPassword, request.newPassword)
+        await user_service.change_user_password(current_user.id, request.currentPassword, request.newPassword)
         return {"message": "Password changed successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/verify-password", status_code=status.HTTP_200_OK)
 async def verify_password(request: VerifyPasswordRequest):
-    current_user = user_context.get()
+    current_user = await user_context.get()
     if current_user is None:
         raise HTTPException(status_code=401, detail="You have not logged in")
     await user_service.verify_user_password(current_user.username, request.password)
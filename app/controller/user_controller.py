@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, Response, status, Query
 from app.schema.user_schema import UserCreate, UserRead, UserUpdate
 from app.service.user_service import UserService
 from app.core.security import user_context, authorization
@@ -11,27 +11,33 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/", response_model=list[UserRead])
 async def list_users(
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
+    cursor: str | None = Query(None, description="Cursor của trang sau (header X-Next-Cursor); khi có cursor thì bỏ qua page"),
     ):
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
-    if not await authorization.check_permission(user_current, "view_users"):
+    # Quyền có thể chỉ cấp trên một số user (target_id): lọc ngay trong câu truy vấn phân trang
+    scope = await authorization.get_permission_scope(user_current, "view_users")
+    if scope.is_empty:
         raise HTTPException(status_code=403, detail="You have no access to this resource")
-    users = await user_service.get_active_users_paginated(page, limit)
+    users, next_cursor = await user_service.get_active_users_paginated(page, limit, scope, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return users
 
 @router.get("/me", response_model=UserRead)
 async def get_current_user():
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
-    return user_current
+    return await user_service.get_user_by_id(user_current.id)
 
 @router.get("/{id}", response_model=UserRead)
 async def get_user(id: int):
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "view_user_details", id):
@@ -50,7 +56,7 @@ async def update_user(
     id: int,
     user_update: UserUpdate,
     ):
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "edit_user", id) and user_current.id != id:
@@ -64,7 +70,7 @@ async def update_user(
 async def delete_user(
     id: int,
     ):
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "delete_user"):
@@ -21,7 +21,7 @@ async def get_permissions_by_user(user_id: int):
       - Người dùng cần đăng nhập để thực hiện hành động này.
       - User hiện tại phải có quyền "view_permissions".
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "view_permissions"):
@@ -48,7 +48,7 @@ async def assign_permission(user_permission: UserPermissionsAssign):
                 }
             }
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "create_permission"):
@@ -79,7 +79,7 @@ async def update_permission(data: UserPermissionsUpdate):
             ]
         }
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "edit_permission"):
@@ -101,7 +101,7 @@ async def delete_permission(data: UserPermissionsDelete):
                 "permissions": [1, 2]
             }
     """
-    user_current = user_context.get()
+    user_current = await user_context.get()
     if not user_current:
         raise HTTPException(status_code=401, detail="You have not logged in")
     if not await authorization.check_permission(user_current, "delete_permission"):
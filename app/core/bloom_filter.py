@@ -0,0 +1,80 @@
+import math
+import time
+import hashlib
+
+
+class BloomFilter:
+    """
+    Bloom filter trên bytearray: chỉ thêm được phần tử, không xóa.
+    `item in filter` có thể dương tính giả (xác suất ~error_rate) nhưng không bao giờ âm tính giả.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing từ một digest 128 bit: h1 + i*h2
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class ExpiringBloomFilter:
+    """
+    Tập các Bloom filter chia theo cửa sổ thời gian hết hạn của phần tử.
+    Mỗi phần tử được thêm vào bucket ứng với thời điểm hết hạn của nó; bucket nào đã qua hẳn
+    thời điểm hết hạn thì bị bỏ đi, nhờ vậy bộ nhớ luôn bị giới hạn theo số phần tử còn hiệu lực.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001, window: int = 900):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window = window
+        self.loaded = False
+        self._buckets: dict[int, BloomFilter] = {}
+
+    def _purge(self, now: float) -> None:
+        current = int(now // self.window)
+        for index in [index for index in self._buckets if index < current]:
+            del self._buckets[index]
+
+    def add(self, item: str, expires_at: float) -> None:
+        """Thêm phần tử, expires_at là Unix timestamp (giây)."""
+        if expires_at < time.time():
+            return
+        index = int(expires_at // self.window)
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            bucket = self._buckets[index] = BloomFilter(self.capacity, self.error_rate)
+        bucket.add(item)
+
+    def rebuild(self, items) -> None:
+        """Dựng lại toàn bộ filter từ danh sách (item, expires_at) rồi đánh dấu đã nạp."""
+        self._buckets = {}
+        for item, expires_at in items:
+            self.add(item, expires_at)
+        self.loaded = True
+
+    def __contains__(self, item: str) -> bool:
+        self._purge(time.time())
+        return any(item in bucket for bucket in self._buckets.values())
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "buckets": len(self._buckets),
+            "items": sum(bucket.count for bucket in self._buckets.values()),
+            "bytes": sum(len(bucket.bits) for bucket in self._buckets.values()),
+        }
@@ -0,0 +1,68 @@
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache LRU trong bộ nhớ của tiến trình, giới hạn số phần tử và thời hạn sống của từng phần tử.
+    Không thread-safe: chỉ dùng trong event loop của worker.
+    """
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Tăng mỗi khi dữ liệu bị xóa chủ động (pop/clear); so sánh trước và sau khi nạp
+        # để không ghi lại vào cache một giá trị đã cũ
+        self.generation = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        """Lấy giá trị theo key, trả về default nếu không có hoặc đã hết hạn."""
+        item = self._data.get(key, _MISSING)
+        if item is not _MISSING:
+            value, expires_at = item
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        """Lưu giá trị với thời hạn ttl giây (mặc định dùng ttl của cache)."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is None or ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        """Xóa một key khỏi cache (nếu có)."""
+        self._data.pop(key, None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Xóa toàn bộ cache."""
+        self._data.clear()
+        self.generation += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Thống kê kích thước và tỉ lệ hit/miss của cache."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
@@ -15,3 +15,60 @@ REFRESH_TOKEN_EXPIRE = 86400*int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 60))  #
 
 JWT_ISSUER = os.getenv("JWT_ISSUER", "https://scime.click")
 JWT_AUDIENCE = os.getenv("JWT_AUDIENCE", "https://shop.scime.click")
+
+# Số token đã xác thực được giữ trong cache của mỗi worker
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+
+# Bloom filter cho blacklist token: sức chứa của mỗi cửa sổ thời gian, tỉ lệ dương tính giả và độ dài cửa sổ (giây)
+BLACKLIST_FILTER_CAPACITY = int(os.getenv("BLACKLIST_FILTER_CAPACITY", 100000))
+BLACKLIST_FILTER_ERROR_RATE = float(os.getenv("BLACKLIST_FILTER_ERROR_RATE", 0.001))
+BLACKLIST_FILTER_WINDOW = int(os.getenv("BLACKLIST_FILTER_WINDOW", 900))
+
+# Kênh LISTEN/NOTIFY dùng để các worker báo cho nhau xóa cache cục bộ
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "cache_invalidation")
+
+# Thread pool băm mật khẩu bcrypt: số thread và số thao tác được chạy đồng thời (phần còn lại xếp hàng)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", PASSWORD_HASH_WORKERS))
+
+# Cache snapshot của user đã xác thực (id, username, email, is_active) trong mỗi worker
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 30))  # giây
+
+# Cache bảng quyết định quyền đã biên dịch của từng user
+PERMISSION_CACHE_SIZE = int(os.getenv("PERMISSION_CACHE_SIZE", 10000))
+PERMISSION_CACHE_TTL = int(os.getenv("PERMISSION_CACHE_TTL", 300))  # giây
+
+# Connection pool của SQLAlchemy (mỗi worker một pool): số connection thường trực, số connection vượt mức,
+# thời gian chờ lấy connection (giây), thời gian tái tạo connection (giây) và kiểm tra connection trước khi dùng
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# asyncpg: số prepared statement được cache trên mỗi connection và statement_timeout phía server (ms, 0 = không giới hạn)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500))
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", 30000))
+
+# Read replica (tùy chọn): các truy vấn chỉ đọc của request GET/HEAD được chuyển sang đây
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+# Cảnh báo N+1: ghi log khi cùng một câu SQL chạy quá số lần này trong một request (0 = tắt)
+QUERY_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", 10))
+
+# Nhật ký câu SQL chậm: ngưỡng (ms, 0 = tắt), tỉ lệ lấy mẫu, độ dài hàng đợi EXPLAIN và file log (xoay vòng)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 0.1))
+SLOW_QUERY_QUEUE_SIZE = int(os.getenv("SLOW_QUERY_QUEUE_SIZE", 100))
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "logs/slow_queries.log")
+
+# Phân trang page/limit (OFFSET) chỉ cho phép tới trang này; trang sâu hơn dùng cursor (X-Next-Cursor)
+MAX_PAGE_DEPTH = int(os.getenv("MAX_PAGE_DEPTH", 100))
+
+# Tìm kiếm sản phẩm: số kết quả khớp tối đa được xếp hạng cho mỗi truy vấn (giới hạn chi phí với từ khóa quá phổ biến)
+PRODUCT_SEARCH_MAX_CANDIDATES = int(os.getenv("PRODUCT_SEARCH_MAX_CANDIDATES", 1000))
+
+# Gợi ý tên sản phẩm (autocomplete): cache kết quả theo chuỗi đã nhập trong thời gian ngắn
+SUGGEST_CACHE_SIZE = int(os.getenv("SUGGEST_CACHE_SIZE", 5000))
+SUGGEST_CACHE_TTL = int(os.getenv("SUGGEST_CACHE_TTL", 30))  # giây
@@ -1,14 +1,274 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, copy_context
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import DATABASE_URL
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import (
+    DATABASE_URL,
+    DATABASE_READ_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_STATEMENT_TIMEOUT,
+)
+from .query_stats import query_stats, install_query_stats
 
 
-# Tạo engine kết nối với cơ sở dữ liệu
-engine = create_async_engine(DATABASE_URL) # thêm echo = True để bật logging SQL
+logger = logging.getLogger(__name__)
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool ghi nhận thời gian chờ lấy connection, dùng để chọn kích thước pool cho mỗi worker."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> dict:
+        """Số connection đang dùng, vượt mức, rảnh và thời gian chờ lấy connection."""
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+            "max_wait_ms": self.wait_max * 1000,
+        }
+
+
+def _connect_args() -> dict:
+    """Tham số kết nối của asyncpg."""
+    args = {"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+    if DB_STATEMENT_TIMEOUT > 0:
+        args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT)}
+    return args
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        poolclass=MonitoredQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=_connect_args(),
+    ) # thêm echo = True để bật logging SQL
+
+
+# Tạo engine kết nối với cơ sở dữ liệu (primary) và read replica (nếu có cấu hình, ngược lại dùng chung primary)
+engine = _create_engine(DATABASE_URL)
+read_engine = _create_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+
+# Đo số câu SQL và thời gian DB của từng request
+install_query_stats(engine)
+if read_engine is not engine:
+    install_query_stats(read_engine)
+
+
+
+class AppSession(Session):
+    """Session đồng bộ bên dưới mọi AsyncSession của ứng dụng; event ORM của ứng dụng được gắn vào class này."""
+
 
 # Tạo session factory
-AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, sync_session_class=AppSession, expire_on_commit=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, class_=AsyncSession, sync_session_class=AppSession, expire_on_commit=False)
 
 # Base cho các model
 Base = declarative_base()
 
+
+class RequestSession(AsyncSession):
+    """
+    Session dùng chung cho toàn bộ một request (unit of work).
+    commit() của repository chỉ flush: thay đổi được ghi xuống DB (sinh id, kiểm tra ràng buộc) trong transaction
+    của request, còn commit/rollback thật do UnitOfWorkMiddleware thực hiện khi request kết thúc.
+    """
+    wrote = False
+
+    async def commit(self) -> None:
+        # Request đã ghi dữ liệu: các truy vấn đọc sau đó phải đọc từ primary
+        self.wrote = True
+        await self.flush()
+
+    async def commit_request(self) -> None:
+        await super().commit()
+
+
+RequestSessionLocal = sessionmaker(bind=engine, class_=RequestSession, sync_session_class=AppSession, expire_on_commit=False)
+
+
+class RequestScope:
+    """
+    Trạng thái unit of work của một request: session primary và session read replica (mở khi cần),
+    các callback chạy sau khi commit.
+    """
+    def __init__(self, read_only: bool = False):
+        # Request GET/HEAD: được phép đọc từ read replica
+        self.read_only = read_only
+        self.session: RequestSession | None = None
+        self.read_session: AsyncSession | None = None
+        self.closed = False
+        self.after_commit: list = []
+
+    def get_session(self) -> RequestSession:
+        if self.session is None:
+            self.session = RequestSessionLocal()
+        return self.session
+
+    def get_read_session(self) -> AsyncSession:
+        """
+        Session cho truy vấn chỉ đọc: read replica nếu request là GET/HEAD và chưa ghi dữ liệu,
+        ngược lại dùng session primary để đọc được chính dữ liệu vừa ghi.
+        """
+        if read_engine is engine or not self.read_only or (self.session is not None and self.session.wrote):
+            return self.get_session()
+        if self.read_session is None:
+            self.read_session = ReadSessionLocal()
+        return self.read_session
+
+    async def commit(self) -> None:
+        if self.session is not None:
+            await self.session.commit_request()
+        callbacks, self.after_commit = self.after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("After-commit callback failed")
+
+    async def finish(self, commit: bool) -> None:
+        """Kết thúc unit of work: commit hoặc rollback rồi trả connection về pool."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if commit:
+                await self.commit()
+            elif self.session is not None:
+                await self.session.rollback()
+        finally:
+            if self.read_session is not None:
+                await self.read_session.close()
+                self.read_session = None
+            if self.session is not None:
+                await self.session.close()
+                self.session = None
+
+
+request_scope: ContextVar[RequestScope | None] = ContextVar("request_scope", default=None)
+
+
+@asynccontextmanager
+async def get_session(read_only: bool = False):
+    """
+    Lấy session cho repository.
+    Trong request: dùng chung session của request (mở ở lần gọi đầu tiên). Ngoài request (lệnh cmd, lifespan,
+    tác vụ nền): mở một session riêng và đóng khi ra khỏi khối `async with`.
+    read_only=True: truy vấn chỉ đọc, được phép chạy trên read replica (xem RequestScope.get_read_session).
+    Các truy vấn nạp cache dùng chung hoặc kiểm tra bảo mật không nên đánh dấu read_only vì replica có thể trễ.
+    """
+    scope = request_scope.get()
+    if scope is None or scope.closed:
+        async with (ReadSessionLocal if read_only else AsyncSessionLocal)() as session:
+            yield session
+    elif read_only:
+        yield scope.get_read_session()
+    else:
+        yield scope.get_session()
+
+
+@contextmanager
+def detached():
+    """
+    Chạy một khối code ngoài session của request (mỗi lần gọi repository dùng session riêng).
+    Dùng khi kết quả được giữ lâu hơn request, ví dụ nạp dữ liệu vào cache dùng chung.
+    """
+    token = request_scope.set(None)
+    try:
+        yield
+    finally:
+        request_scope.reset(token)
+
+
+def create_background_task(coro) -> asyncio.Task:
+    """
+    Tạo task chạy nền không dùng chung session của request hiện tại (một session không được dùng đồng thời)
+    và không tính vào thống kê SQL của request.
+    """
+    context = copy_context()
+    context.run(request_scope.set, None)
+    context.run(query_stats.set, None)
+    return asyncio.create_task(coro, context=context)
+
+
+def after_request_commit(callback) -> None:
+    """Đăng ký callback chạy sau khi transaction của request được commit (bỏ qua nếu không ở trong request)."""
+    scope = request_scope.get()
+    if scope is not None and not scope.closed:
+        scope.after_commit.append(callback)
+
+
+async def commit() -> None:
+    """Commit ngay các thay đổi của request, dùng khi cần giữ thay đổi dù request sau đó trả về lỗi."""
+    scope = request_scope.get()
+    if scope is not None and not scope.closed:
+        await scope.commit()
+
+
+class UnitOfWorkMiddleware:
+    """
+    Middleware ASGI thuần: mỗi request dùng một session (chỉ mở khi repository cần tới DB).
+    Transaction được commit ngay trước khi gửi response nếu status < 400, ngược lại hoặc khi có exception thì rollback.
+    Commit trước khi gửi response để client nhận được response thì dữ liệu đã được ghi.
+    Request GET/HEAD được đọc từ read replica cho tới khi ghi dữ liệu lần đầu.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        unit_of_work = RequestScope(read_only=scope["method"] in ("GET", "HEAD"))
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                await unit_of_work.finish(message["status"] < 400)
+            await send(message)
+
+        reset_token = request_scope.set(unit_of_work)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await unit_of_work.finish(False)
+            request_scope.reset(reset_token)
@@ -0,0 +1,105 @@
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy import event
+from .database import engine, read_engine
+
+
+def _sample_calls():
+    """Các truy vấn nóng của repository cần được phục vụ bởi index (giá trị tham số chỉ dùng để sinh câu SQL)."""
+    from app.repository.product_repository import ProductRepository
+    from app.repository.user_repository import UserRepository
+    from app.repository.product_attribute_repository import ProductAttributeRepository
+    from app.repository.category_repository import CategoryRepository
+    from app.repository.group_repository import GroupRepository
+    from app.repository.group_member_repository import GroupMemberRepository
+    from app.repository.user_permission_repository import UserPermissionRepository
+    from app.repository.group_permission_repository import GroupPermissionRepository
+    from app.repository.authorization_repository import AuthorizationRepository
+    from app.repository.blacklist_token_repository import BlacklistTokenRepository
+    from app.repository.refresh_token_repository import RefreshTokenRepository
+
+    products = ProductRepository()
+    users = UserRepository()
+    groups = GroupRepository()
+    return [
+        ("product.find_by_category_id", lambda: products.find_by_category_id(1)),
+        ("product.find_all_paginated(page)", lambda: products.find_all_paginated(1, 20)),
+        ("product.find_all_paginated(cursor)", lambda: products.find_all_paginated(1, 20, after=(1,))),
+        ("product.find_by_id", lambda: products.find_by_id(1)),
+        ("product.search_products_by_keywords", lambda: products.search_products_by_keywords("laptop dell")),
+        ("product.suggest_names", lambda: products.suggest_names("lapt", 10)),
+        ("product_attribute.find_by_product_ids", lambda: ProductAttributeRepository().find_by_product_ids([1, 2])),
+        (
+            "product.find_all_paginated(price, cursor)",
+            lambda: products.find_all_paginated(1, 20, after=(Decimal("10"), 1), sort="price"),
+        ),
+        ("user.get_active_users_paginated(page)", lambda: users.get_active_users_paginated(1, 20)),
+        ("user.get_active_users_paginated(cursor)", lambda: users.get_active_users_paginated(1, 20, after=(1,))),
+        ("user.get_user_by_id", lambda: users.get_user_by_id(1)),
+        ("user.get_user_by_username", lambda: users.get_user_by_username("superadmin")),
+        ("user.get_user_by_email", lambda: users.get_user_by_email("admin@example.com")),
+        ("category.find_by_parent_id", lambda: CategoryRepository().find_by_parent_id(1)),
+        ("group.get_groups_paginated(cursor)", lambda: groups.get_groups_paginated(1, 20, after=(1,))),
+        ("group.get_group_by_id", lambda: groups.get_group_by_id(1)),
+        ("group.get_group_by_name", lambda: groups.get_group_by_name("admin")),
+        (
+            "group_member.find_group_members_by_group",
+            lambda: GroupMemberRepository().find_group_members_by_group(SimpleNamespace(id=1)),
+        ),
+        ("user_permission.find_enabled_grants_by_user", lambda: UserPermissionRepository().find_enabled_grants_by_user(1)),
+        ("group_permission.find_enabled_grants_by_user", lambda: GroupPermissionRepository().find_enabled_grants_by_user(1)),
+        ("authorization.resolve_permission", lambda: AuthorizationRepository().resolve_permission(1, "view_users", 1)),
+        ("blacklist_token.is_token_blacklisted", lambda: BlacklistTokenRepository().is_token_blacklisted("token")),
+        ("blacklist_token.find_active_tokens", lambda: BlacklistTokenRepository().find_active_tokens()),
+        ("refresh_token.get_token", lambda: RefreshTokenRepository().get_token("token")),
+    ]
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    """Tên các bảng bị quét tuần tự trong một cây EXPLAIN (FORMAT JSON)."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+async def check_indexes() -> list[tuple[str, list[str], str]]:
+    """
+    Chạy các truy vấn mẫu, bắt lại câu SQL thực tế mà repository sinh ra và EXPLAIN chúng với enable_seqscan = off:
+    khi đó planner chỉ chọn Seq Scan nếu không có index nào dùng được, nên kết quả không phụ thuộc vào lượng dữ liệu.
+    Trả về danh sách (truy vấn, các bảng bị Seq Scan, câu SQL) của những truy vấn thiếu index.
+    """
+    captured: list[tuple[str, str, object]] = []
+    current = {"name": None}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if current["name"] is not None and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((current["name"], statement, parameters))
+
+    engines = {engine.sync_engine, read_engine.sync_engine}
+    for sync_engine in engines:
+        event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        for name, call in _sample_calls():
+            current["name"] = name
+            await call()
+    finally:
+        current["name"] = None
+        for sync_engine in engines:
+            event.remove(sync_engine, "before_cursor_execute", capture)
+
+    missing = []
+    async with engine.connect() as connection:
+        for name, statement, parameters in captured:
+            async with connection.begin():
+                await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            tables = _seq_scans(plan[0]["Plan"])
+            if tables:
+                missing.append((name, tables, statement))
+    return missing
@@ -0,0 +1,129 @@
+import os
+import json
+import asyncio
+import inspect
+import logging
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from app.core.config import DATABASE_URL, INVALIDATION_CHANNEL
+from app.core.database import get_session, after_request_commit, create_background_task
+
+
+logger = logging.getLogger(__name__)
+
+# Định danh của worker hiện tại, dùng để bỏ qua các NOTIFY do chính worker này phát ra
+INSTANCE_ID = os.urandom(8).hex()
+
+_handlers: dict[str, list] = {}
+
+
+def subscribe(topic: str, handler) -> None:
+    """
+    Đăng ký hàm xử lý invalidation cho một topic.
+    handler(key, data) được gọi khi có thay đổi; key=None nghĩa là phải xóa toàn bộ dữ liệu của topic.
+    handler có thể là hàm thường hoặc coroutine function.
+    """
+    _handlers.setdefault(topic, []).append(handler)
+
+
+def dispatch(topic: str, key=None, data: dict | None = None) -> None:
+    """Gọi các handler đã đăng ký cho topic trong worker hiện tại."""
+    for handler in _handlers.get(topic, []):
+        try:
+            result = handler(key, data or {})
+            if inspect.iscoroutine(result):
+                create_background_task(result)
+            elif inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+        except Exception:
+            logger.exception("Invalidation handler failed for topic %s", topic)
+
+
+def dispatch_all() -> None:
+    """Xóa toàn bộ dữ liệu của mọi topic (ví dụ sau khi mất kết nối LISTEN và có thể đã lỡ thông báo)."""
+    for topic in list(_handlers):
+        dispatch(topic)
+
+
+async def publish(topic: str, key=None, **data) -> None:
+    """
+    Invalidation cho worker hiện tại rồi phát NOTIFY để các worker khác cùng xóa cache tương ứng.
+    Trong request, NOTIFY nằm trong transaction của request nên chỉ được gửi khi request commit; cache cục bộ
+    được xóa thêm một lần sau khi commit để bỏ các giá trị cũ được nạp lại trong lúc chưa commit.
+    Lỗi khi NOTIFY chỉ được ghi log: dữ liệu đã được ghi, các worker khác sẽ tự làm mới khi cache hết hạn.
+    NOTIFY chạy trong savepoint để khi lỗi (ví dụ payload quá 8000 byte) transaction của request vẫn dùng được.
+    """
+    dispatch(topic, key, data)
+    after_request_commit(lambda: dispatch(topic, key, data))
+    payload = json.dumps({"source": INSTANCE_ID, "topic": topic, "key": key, "data": data}, default=str)
+    try:
+        async with get_session() as session:
+            async with session.begin_nested():
+                await session.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": INVALIDATION_CHANNEL, "payload": payload},
+                )
+            await session.commit()
+    except Exception:
+        logger.exception("Unable to publish invalidation for topic %s", topic)
+
+
+class InvalidationListener:
+    """
+    Giữ một kết nối LISTEN riêng (ngoài connection pool) tới Postgres cho mỗi worker.
+    Khi nhận NOTIFY từ worker khác thì gọi các handler đã đăng ký; tự kết nối lại khi bị ngắt.
+    """
+    def __init__(self, channel: str = INVALIDATION_CHANNEL, retry_delay: float = 5):
+        self.channel = channel
+        self.retry_delay = retry_delay
+        self.dsn = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._task: asyncio.Task | None = None
+        self._connected_once = False
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("source") == INSTANCE_ID:
+            return
+        dispatch(message.get("topic"), message.get("key"), message.get("data"))
+
+    async def _run(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                if self._connected_once:
+                    # Có thể đã lỡ thông báo trong lúc mất kết nối
+                    dispatch_all()
+                self._connected_once = True
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Invalidation listener disconnected, retrying in %ss", self.retry_delay, exc_info=True)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.retry_delay)
+
+
+invalidation_listener = InvalidationListener()
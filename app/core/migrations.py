@@ -0,0 +1,79 @@
+import pkgutil
+import importlib
+from sqlalchemy import text
+from .database import engine
+
+
+MIGRATIONS_PACKAGE = "app.migrations"
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(64) PRIMARY KEY,
+    description TEXT,
+    applied_at TIMESTAMP NOT NULL DEFAULT now()
+)
+"""
+
+
+def available_migrations() -> list:
+    """
+    Danh sách migration theo thứ tự phiên bản. Mỗi migration là một module trong app/migrations (vNNNN_<tên>.py) gồm:
+    DESCRIPTION, UPGRADE, DOWNGRADE (danh sách câu SQL) và TRANSACTIONAL (False nếu có câu không chạy được
+    trong transaction, ví dụ CREATE INDEX CONCURRENTLY).
+    """
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    names = sorted(info.name for info in pkgutil.iter_modules(package.__path__) if info.name.startswith("v"))
+    return [importlib.import_module(f"{MIGRATIONS_PACKAGE}.{name}") for name in names]
+
+
+def _version(module) -> str:
+    return module.__name__.rsplit(".", 1)[-1]
+
+
+async def _applied_versions() -> set[str]:
+    async with engine.begin() as conn:
+        await conn.execute(text(_CREATE_TABLE))
+        result = await conn.execute(text("SELECT version FROM schema_migrations"))
+        return set(result.scalars().all())
+
+
+async def _run(module, statements: list[str], record) -> None:
+    """
+    Chạy các câu SQL của migration rồi ghi/xóa phiên bản trong schema_migrations.
+    Migration TRANSACTIONAL=False chạy ở chế độ AUTOCOMMIT; các câu dùng IF [NOT] EXISTS nên chạy lại được nếu bị ngắt giữa chừng.
+    """
+    if getattr(module, "TRANSACTIONAL", True):
+        async with engine.begin() as conn:
+            for statement in statements:
+                await conn.execute(text(statement))
+            await conn.execute(record)
+        return
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in statements:
+            await conn.execute(text(statement))
+        await conn.execute(record)
+
+
+async def migrate() -> list[str]:
+    """Chạy các migration chưa được áp dụng theo thứ tự, trả về danh sách phiên bản vừa chạy."""
+    applied = await _applied_versions()
+    done = []
+    for module in available_migrations():
+        if _version(module) in applied:
+            continue
+        record = text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)")
+        await _run(module, module.UPGRADE, record.bindparams(version=_version(module), description=module.DESCRIPTION))
+        done.append(_version(module))
+    return done
+
+
+async def downgrade() -> str | None:
+    """Hoàn tác migration được áp dụng gần nhất, trả về phiên bản đã hoàn tác (None nếu không có)."""
+    applied = await _applied_versions()
+    for module in reversed(available_migrations()):
+        if _version(module) in applied:
+            record = text("DELETE FROM schema_migrations WHERE version = :version")
+            await _run(module, module.DOWNGRADE, record.bindparams(version=_version(module)))
+            return _version(module)
+    return None
@@ -0,0 +1,64 @@
+import json
+import base64
+import binascii
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from .config import MAX_PAGE_DEPTH
+
+
+def encode_cursor(*values) -> str:
+    """Mã hóa giá trị các cột sắp xếp (sort_key, ..., id) của dòng cuối trang thành cursor mờ."""
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+# Cột id là BIGINT: số ngoài khoảng này làm asyncpg báo lỗi khi bind tham số
+_BIGINT_MIN, _BIGINT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _valid_value(value, expected) -> bool:
+    if isinstance(value, bool) or not isinstance(value, expected):
+        return False
+    return not isinstance(value, int) or _BIGINT_MIN <= value <= _BIGINT_MAX
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """
+    Giải mã cursor gồm len(types) giá trị, giá trị thứ i phải có kiểu types[i] (một kiểu hoặc tuple các kiểu).
+    Raise HTTPException 400 nếu cursor không hợp lệ, để cursor bị sửa không đi tới câu SQL.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not all(_valid_value(value, expected) for value, expected in zip(values, types)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(values)
+
+
+def check_page_depth(page: int) -> None:
+    """Phân trang theo page/limit (OFFSET) chỉ cho phép tới MAX_PAGE_DEPTH; trang sâu hơn phải dùng cursor."""
+    if page > MAX_PAGE_DEPTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Page depth is limited to {MAX_PAGE_DEPTH}, use the cursor from X-Next-Cursor instead",
+        )
+
+
+def keyset_clause(columns: list, after: tuple):
+    """Điều kiện lấy các dòng đứng sau cursor theo thứ tự tăng dần của columns (dùng được index của các cột)."""
+    if len(columns) == 1:
+        return columns[0] > after[0]
+    return tuple_(*columns) > tuple_(*after)
+
+
+def split_page(rows: list, limit: int, key) -> tuple[list, str | None]:
+    """
+    Repository lấy limit + 1 dòng: nếu có dòng thừa thì còn trang sau, cursor được tạo từ dòng cuối của trang.
+    key(row) trả về giá trị các cột sắp xếp của một dòng.
+    """
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = list(rows[:limit])
+    return rows, encode_cursor(*key(rows[-1]))
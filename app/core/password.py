@@ -0,0 +1,73 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from app.core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_CONCURRENCY
+
+
+class PasswordHasher:
+    """
+    Băm và kiểm tra mật khẩu bcrypt trên thread pool riêng để không chặn event loop.
+    Số thao tác chạy đồng thời bị giới hạn: khi có nhiều lượt đăng nhập cùng lúc, các yêu cầu
+    xếp hàng chờ ở đây thay vì chiếm hết CPU của các route khác.
+    """
+    def __init__(self, max_workers: int, max_concurrency: int):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # Số liệu thống kê
+        self.waiting = 0
+        self.max_waiting = 0
+        self.running = 0
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.total_wait_time = 0.0
+
+    async def _run(self, func, *args):
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self.running -= 1
+            self.calls += 1
+            self.total_time += elapsed
+            self.total_wait_time += started_at - queued_at
+            self.max_time = max(self.max_time, elapsed)
+            self.semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        """Băm mật khẩu."""
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Kiểm tra mật khẩu với chuỗi đã băm."""
+        return await self._run(self.context.verify, password, hashed_password)
+
+    def stats(self) -> dict:
+        """Độ dài hàng đợi và thời gian băm của worker hiện tại."""
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "running": self.running,
+            "calls": self.calls,
+            "avg_hash_ms": self.total_time / self.calls * 1000 if self.calls else 0.0,
+            "max_hash_ms": self.max_time * 1000,
+            "avg_wait_ms": self.total_wait_time / self.calls * 1000 if self.calls else 0.0,
+        }
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_CONCURRENCY)
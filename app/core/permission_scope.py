@@ -0,0 +1,31 @@
+from sqlalchemy import true, false
+
+
+class PermissionScope:
+    """
+    Phạm vi target được phép của một quyền.
+    - allow_all = True: được phép trên mọi target, trừ các target trong target_ids.
+    - allow_all = False: chỉ được phép trên các target trong target_ids.
+    """
+    __slots__ = ("allow_all", "target_ids")
+
+    def __init__(self, allow_all: bool, target_ids: frozenset[int] = frozenset()):
+        self.allow_all = allow_all
+        self.target_ids = target_ids
+
+    @property
+    def is_empty(self) -> bool:
+        """Không được phép trên target nào."""
+        return not self.allow_all and not self.target_ids
+
+    def allows(self, target_id: int) -> bool:
+        return (target_id in self.target_ids) != self.allow_all
+
+    def as_clause(self, column):
+        """
+        Chuyển phạm vi thành điều kiện WHERE của SQLAlchemy trên cột id của target,
+        để repository lọc và phân trang ngay trong một câu truy vấn.
+        """
+        if self.allow_all:
+            return column.not_in(self.target_ids) if self.target_ids else true()
+        return column.in_(self.target_ids) if self.target_ids else false()
@@ -0,0 +1,118 @@
+import time
+import logging
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import QUERY_N_PLUS_ONE_THRESHOLD
+from .slow_query import slow_query_log
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Thống kê các câu SQL của một request: số câu, tổng thời gian DB, câu chậm nhất và số lần lặp của từng câu."""
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: str | None = None
+        # Câu SQL (đã tham số hóa) -> số lần chạy, dùng để phát hiện N+1
+        self.shapes: dict[str, int] = {}
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if duration > self.slowest:
+            self.slowest = duration
+            self.slowest_statement = statement
+        repeats = self.shapes.get(statement, 0) + 1
+        self.shapes[statement] = repeats
+        if QUERY_N_PLUS_ONE_THRESHOLD and repeats == QUERY_N_PLUS_ONE_THRESHOLD + 1:
+            logger.warning(
+                "Possible N+1 query in %s: statement repeated more than %d times: %s",
+                self.path, QUERY_N_PLUS_ONE_THRESHOLD, statement,
+                extra={"path": self.path, "db_repeated_statement": statement},
+            )
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total * 1000:.1f};desc="{self.count} queries", '
+            f'db-slowest;dur={self.slowest * 1000:.1f}'
+        )
+
+    def log_fields(self) -> dict:
+        return {
+            "path": self.path,
+            "db_queries": self.count,
+            "db_time_ms": round(self.total * 1000, 1),
+            "db_slowest_ms": round(self.slowest * 1000, 1),
+            "db_slowest_statement": self.slowest_statement,
+        }
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    # Event chạy trong greenlet của SQLAlchemy nhưng vẫn thấy contextvar của request gọi tới
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if not executemany:
+        slow_query_log.observe(statement, parameters, duration, stats.path if stats is not None else None)
+
+
+def _handle_error(exception_context):
+    # Câu SQL lỗi không đi qua after_cursor_execute: bỏ mốc thời gian đã ghi
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def install_query_stats(engine) -> None:
+    """Gắn các event đo thời gian SQL vào engine (AsyncEngine)."""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI thuần: đo số câu SQL và thời gian DB của mỗi request,
+    trả về qua header Server-Timing và ghi log với các trường db_queries, db_time_ms, db_slowest_ms.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope["path"])
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        reset_token = query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(reset_token)
+            if stats.count:
+                logger.info(
+                    "%s %s: %d queries in %.1f ms",
+                    scope["method"], scope["path"], stats.count, stats.total * 1000,
+                    extra=stats.log_fields(),
+                )
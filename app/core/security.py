@@ -1,8 +1,8 @@
-from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 from contextvars import ContextVar
-from app.model.user import User
+from app.schema.user_schema import UserSnapshot
 from app.service.authentication_service import AuthenticationService
 from app.service.authorization_service import AuthorizationService
 
@@ -10,31 +10,77 @@ from app.service.authorization_service import AuthorizationService
 authentication = AuthenticationService()
 authorization = AuthorizationService()
 
-user_context: ContextVar[User | None] = ContextVar("user_context", default=None)
-payload_context: ContextVar[str | None] = ContextVar("payload_context", default=None)
 
-class JWTMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        auth_header: str | None = request.headers.get("Authorization")
+class AuthState:
+    """
+    Trạng thái xác thực của một request.
+    Token chỉ được giải mã (kiểm tra blacklist, truy vấn user) ở lần đầu tiên có nơi truy cập user/payload.
+    """
+    def __init__(self, token: str | None):
+        self.token = token
+        self.user: UserSnapshot | None = None
+        self.payload: dict | None = None
+        self.error: HTTPException | None = None
+        self.resolved = token is None
+
+    async def resolve(self) -> None:
+        if not self.resolved:
+            try:
+                user, payload = await authentication.get_current_user(self.token)
+                if payload["type"] != "access":
+                    raise HTTPException(status_code=401, detail="Invalid token")
+                self.user = user
+                self.payload = payload
+            except HTTPException as e:
+                self.error = e
+            self.resolved = True
+        if self.error:
+            raise self.error
+
+
+auth_state: ContextVar[AuthState | None] = ContextVar("auth_state", default=None)
+
+
+class LazyAuthContext:
+    """
+    Truy cập thông tin xác thực của request hiện tại: `await user_context.get()`.
+    Ném HTTPException (401, ...) nếu token gửi lên không hợp lệ.
+    """
+    def __init__(self, attribute: str):
+        self.attribute = attribute
+
+    async def get(self):
+        state = auth_state.get()
+        if state is None:
+            return None
+        await state.resolve()
+        return getattr(state, self.attribute)
+
+
+user_context = LazyAuthContext("user")
+payload_context = LazyAuthContext("payload")
+
+
+class JWTMiddleware:
+    """
+    Middleware ASGI thuần: chỉ đọc header Authorization và ghi token vào context.
+    Các route công khai (không truy cập user_context) không tốn chi phí giải mã token hay truy vấn DB.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = None
+        auth_header = Headers(scope=scope).get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header.split(" ")[1]
-            try: 
-                user, payload = await authentication.get_current_user(token)
-                user_context.set(user)
-                payload_context.set(payload)
-                if payload['type']!='access':
-                    return JSONResponse(
-                    status_code=401,
-                    content={"detail": 'Invalid token'},
-                )
-            except HTTPException as e:
-                return JSONResponse(
-                    status_code=e.status_code,
-                    content={"detail": e.detail},
-                )
-        else:
-            user_context.set(None)
-            payload_context.set(None)
-
-        response = await call_next(request)
-        return response
+
+        reset_token = auth_state.set(AuthState(token))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            auth_state.reset(reset_token)
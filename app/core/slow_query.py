@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, date
+from decimal import Decimal
+from logging.handlers import RotatingFileHandler
+from .config import (
+    SLOW_QUERY_THRESHOLD_MS,
+    SLOW_QUERY_SAMPLE_RATE,
+    SLOW_QUERY_QUEUE_SIZE,
+    SLOW_QUERY_LOG_FILE,
+)
+
+
+# Nhật ký câu SQL chậm: mỗi dòng là một bản ghi JSON
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+def redact(value):
+    """Che giá trị tham số: chỉ giữ lại None, bool, số và ngày giờ; chuỗi/bytes được thay bằng kiểu và độ dài."""
+    if value is None or isinstance(value, (bool, int, float, Decimal)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    return f"<{type(value).__name__}>"
+
+
+class SlowQueryLog:
+    """
+    Ghi lại các câu SQL chậm hơn ngưỡng kèm tham số đã được che, route và EXPLAIN (FORMAT JSON).
+    Chỉ lấy mẫu một phần các câu chậm và đưa vào hàng đợi có giới hạn (đầy thì bỏ); EXPLAIN được chạy tuần tự
+    bởi một task nền trên connection riêng, không nằm trên đường xử lý request.
+    """
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+        sample_rate: float = SLOW_QUERY_SAMPLE_RATE,
+        queue_size: int = SLOW_QUERY_QUEUE_SIZE,
+        log_file: str | None = SLOW_QUERY_LOG_FILE,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.queue_size = queue_size
+        self.log_file = log_file
+        self.engine = None
+        self.dropped = 0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def observe(self, statement: str, parameters, duration: float, path: str | None) -> None:
+        """Gọi sau mỗi câu SQL; chỉ tốn một phép so sánh với các câu nhanh."""
+        if self._queue is None or duration < self.threshold:
+            return
+        if random.random() >= self.sample_rate or statement.startswith("EXPLAIN"):
+            return
+        try:
+            self._queue.put_nowait((statement, parameters, duration, path, time.time()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _setup_logger(self) -> None:
+        if not self.log_file or slow_query_logger.handlers:
+            return
+        directory = os.path.dirname(self.log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(self.log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.INFO)
+        slow_query_logger.propagate = False
+
+    def start(self, engine) -> None:
+        if self._task is None and self.threshold:
+            self._setup_logger()
+            self.engine = engine
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._queue = None
+
+    async def _explain(self, statement: str, parameters):
+        # Chỉ EXPLAIN (không ANALYZE) câu đọc: không thực thi lại câu SQL
+        if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None
+        async with self.engine.connect() as connection:
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+        return json.loads(plan) if isinstance(plan, str) else plan
+
+    async def _run(self) -> None:
+        while True:
+            statement, parameters, duration, path, logged_at = await self._queue.get()
+            try:
+                plan = await self._explain(statement, parameters)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                plan = {"error": str(e)}
+            slow_query_logger.info(json.dumps({
+                "time": datetime.fromtimestamp(logged_at).isoformat(),
+                "route": path,
+                "duration_ms": round(duration * 1000, 1),
+                "statement": statement,
+                "parameters": redact(parameters),
+                "plan": plan,
+            }, ensure_ascii=False, default=str))
+
+
+slow_query_log = SlowQueryLog()
@@ -1,11 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.security import JWTMiddleware  # Import middleware
+from app.core.database import engine, UnitOfWorkMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.slow_query import slow_query_log
 from app.core.utils import custom_openapi
 from app.controller import routers  # Import danh sách routers
+from app.core.invalidation import invalidation_listener
+from app.service.blacklist_token_service import BlacklistTokenService
+from app.service.permission_service import permission_catalog
 
-app = FastAPI()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nạp bloom filter của blacklist token trước khi nhận request
+    await BlacklistTokenService().load_filter()
+    # Nạp danh mục quyền (name <-> id <-> default) vào bộ nhớ
+    await permission_catalog.load()
+    # Lắng nghe NOTIFY để xóa cache cục bộ khi worker khác thay đổi dữ liệu
+    invalidation_listener.start()
+    # Task nền chạy EXPLAIN cho các câu SQL chậm được lấy mẫu
+    slow_query_log.start(engine)
+    yield
+    await slow_query_log.stop()
+    await invalidation_listener.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(UnitOfWorkMiddleware)
 app.add_middleware(JWTMiddleware)
+# Ngoài cùng: Server-Timing được ghi sau khi request đã commit
+app.add_middleware(QueryStatsMiddleware)
 
 # Đăng ký các router
 for router in routers:
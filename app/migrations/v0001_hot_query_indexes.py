@@ -0,0 +1,39 @@
+"""
+Index cho các điều kiện truy vấn thường dùng của repository.
+Tạo bằng CREATE INDEX CONCURRENTLY để không khóa ghi trên bảng đang chạy (nên không chạy trong transaction).
+Tên index trùng với khai báo trong model, nên DB tạo mới bằng init_db (create_all) chạy lại migration này không thay đổi gì.
+"""
+
+DESCRIPTION = "Index cho các điều kiện truy vấn thường dùng"
+
+TRANSACTIONAL = False
+
+UPGRADE = [
+    # ProductRepository.find_all_paginated: WHERE is_delete = false ORDER BY id (OFFSET hoặc keyset id > :cursor)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_id ON products (id) WHERE is_delete = false",
+    # ProductRepository.find_by_category_id
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_category_id ON products (category_id)",
+    # ProductService: các option của một sản phẩm
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_options_product_id ON product_options (product_id)",
+    # UserRepository.get_active_users_paginated: WHERE is_active = true ORDER BY id
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_active_id ON users (id) WHERE is_active = true",
+    # CategoryRepository.find_by_parent_id
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_categories_parent_id ON categories (parent_id)",
+    # GroupMemberRepository.find_group_members_by_group (khóa chính (user_id, group_id) chỉ phục vụ tra theo user_id)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_group_members_group_id ON group_members (group_id)",
+    # BlacklistTokenRepository.find_active_tokens / delete_expired_tokens
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_blacklist_tokens_expires_at ON blacklist_tokens (expires_at)",
+    # RefreshTokenRepository.delete_expired_tokens
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_refresh_tokens_expires_at ON refresh_tokens (expires_at)",
+]
+
+DOWNGRADE = [
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_products_active_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_products_category_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_product_options_product_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_users_active_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_categories_parent_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_group_members_group_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_blacklist_tokens_expires_at",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_refresh_tokens_expires_at",
+]
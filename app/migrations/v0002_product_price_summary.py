@@ -0,0 +1,46 @@
+"""
+Cột tổng hợp giá/tồn kho của sản phẩm (min_price, max_price, total_stock, option_count) và index sắp xếp theo giá.
+Cột được tính lại trong ứng dụng mỗi khi tùy chọn thay đổi; migration này chỉ thêm cột và tính giá trị ban đầu
+(chạy sau init_db để các bảng tùy chọn đã tồn tại).
+"""
+
+DESCRIPTION = "Cột tổng hợp giá/tồn kho của sản phẩm"
+
+TRANSACTIONAL = False
+
+UPGRADE = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS min_price NUMERIC(10, 2)",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS max_price NUMERIC(10, 2)",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS total_stock INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS option_count INTEGER NOT NULL DEFAULT 0",
+    """
+    UPDATE products AS p
+    SET min_price = s.min_price, max_price = s.max_price, total_stock = s.total_stock, option_count = s.option_count
+    FROM (
+        SELECT pr.id AS product_id,
+               min(o.price) FILTER (WHERE o.valid) AS min_price,
+               max(o.price) FILTER (WHERE o.valid) AS max_price,
+               coalesce(sum(o.stock) FILTER (WHERE o.valid), 0) AS total_stock,
+               count(o.id) AS option_count
+        FROM products AS pr
+        LEFT JOIN LATERAL (
+            SELECT po.id, po.price, po.stock,
+                   count(*) OVER () = 1
+                   OR EXISTS (SELECT 1 FROM product_option_values AS v WHERE v.product_option_id = po.id) AS valid
+            FROM product_options AS po
+            WHERE po.product_id = pr.id
+        ) AS o ON true
+        GROUP BY pr.id
+    ) AS s
+    WHERE p.id = s.product_id
+    """,
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_price ON products (min_price, id) WHERE is_delete = false",
+]
+
+DOWNGRADE = [
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_products_active_price",
+    "ALTER TABLE products DROP COLUMN IF EXISTS option_count",
+    "ALTER TABLE products DROP COLUMN IF EXISTS total_stock",
+    "ALTER TABLE products DROP COLUMN IF EXISTS max_price",
+    "ALTER TABLE products DROP COLUMN IF EXISTS min_price",
+]
@@ -0,0 +1,50 @@
+"""
+Bảng product_documents: DTO của sản phẩm được tạo sẵn khi ghi, trang chi tiết chỉ đọc một dòng.
+Document của các sản phẩm có sẵn (chưa xóa) được tạo ngay trong migration, cùng dạng với ProductService.to_dto
+được mã hóa theo ProductDto (giá là chuỗi); sau đó document chỉ được tạo lại khi ghi.
+"""
+
+DESCRIPTION = "Document JSON tạo sẵn của sản phẩm"
+
+TRANSACTIONAL = True
+
+UPGRADE = [
+    """
+    CREATE TABLE IF NOT EXISTS product_documents (
+        product_id BIGINT PRIMARY KEY REFERENCES products (id),
+        body JSONB NOT NULL,
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    INSERT INTO product_documents (product_id, body)
+    SELECT p.id, jsonb_build_object(
+        'id', p.id,
+        'name', p.name,
+        'location_address', p.location_address,
+        'category_id', p.category_id,
+        'description', p.description,
+        'price', p.min_price::text,
+        'stock', p.total_stock,
+        'attribute', coalesce(a.attribute, '{}'::jsonb),
+        'discount_percentage', p.discount_percentage
+    )
+    FROM products AS p
+    LEFT JOIN LATERAL (
+        SELECT jsonb_object_agg(pa.name, coalesce(v.vals, '[]'::jsonb) ORDER BY pa.id) AS attribute
+        FROM product_attributes AS pa
+        LEFT JOIN LATERAL (
+            SELECT jsonb_agg(pv.value ORDER BY pv.id) AS vals
+            FROM product_attribute_values AS pv
+            WHERE pv.product_attribute_id = pa.id
+        ) AS v ON true
+        WHERE pa.product_id = p.id
+    ) AS a ON true
+    WHERE p.is_delete IS NOT TRUE
+    ON CONFLICT (product_id) DO NOTHING
+    """,
+]
+
+DOWNGRADE = [
+    "DROP TABLE IF EXISTS product_documents",
+]
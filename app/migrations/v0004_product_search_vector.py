@@ -0,0 +1,23 @@
+"""
+Tìm kiếm toàn văn cho sản phẩm: cột sinh search_vector (tên trọng số A, mô tả trọng số B) và index GIN.
+Thêm cột GENERATED ... STORED sẽ ghi lại toàn bộ bảng products (khóa bảng trong lúc chạy), nên chạy vào giờ thấp điểm.
+"""
+
+DESCRIPTION = "Tìm kiếm toàn văn cho sản phẩm"
+
+TRANSACTIONAL = False
+
+UPGRADE = [
+    """
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)",
+]
+
+DOWNGRADE = [
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_products_search_vector",
+    "ALTER TABLE products DROP COLUMN IF EXISTS search_vector",
+]
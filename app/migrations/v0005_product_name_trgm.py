@@ -0,0 +1,18 @@
+"""
+Gợi ý tên sản phẩm: extension pg_trgm và index GIN trigram trên products.name (chỉ sản phẩm chưa xóa).
+CREATE EXTENSION cần quyền tạo extension trên database.
+"""
+
+DESCRIPTION = "Index trigram cho gợi ý tên sản phẩm"
+
+TRANSACTIONAL = False
+
+UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops) WHERE is_delete = false",
+]
+
+DOWNGRADE = [
+    # Giữ lại extension pg_trgm vì có thể được dùng ở nơi khác
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_products_name_trgm",
+]
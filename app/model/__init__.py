@@ -9,6 +9,10 @@ from .user_permission import UserPermission
 from .blacklist_token import BlacklistToken
 from .refresh_token import RefreshToken
 from .product_option import ProductOption
+from .product_attribute import ProductAttribute
+from .product_attribute_value import ProductAttributeValue
+from .product_option_value import ProductOptionValue
+from .product_document import ProductDocument
 
 # Danh sách tất cả model (dùng để import gọn)
 all_models = [
@@ -22,5 +26,9 @@ all_models = [
     UserPermission,
     BlacklistToken,
     RefreshToken,
-    ProductOption
+    ProductOption,
+    ProductAttribute,
+    ProductAttributeValue,
+    ProductOptionValue,
+    ProductDocument
 ]
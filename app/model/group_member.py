@@ -8,7 +8,7 @@ class GroupMember(Base):
     __table_args__ = (UniqueConstraint("user_id", "group_id", name="unique_user_group"),)
 
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, index=True)
-    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True, index=True)
 
     user = relationship("User")
     group = relationship("Group")
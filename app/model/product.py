@@ -1,10 +1,29 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, Numeric, TIMESTAMP, ForeignKey, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.core.database import Base
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Danh sách sản phẩm chưa xóa, sắp xếp/phân trang theo id
+        Index("ix_products_active_id", "id", postgresql_where=text("is_delete = false")),
+        Index("ix_products_category_id", "category_id"),
+        # Sắp xếp/phân trang theo giá (min_price, id)
+        Index("ix_products_active_price", "min_price", "id", postgresql_where=text("is_delete = false")),
+        # Tìm kiếm toàn văn theo tên và mô tả
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        # Gợi ý tên sản phẩm (pg_trgm): tìm theo tiền tố và theo độ tương đồng, chịu được lỗi chính tả
+        Index(
+            "ix_products_name_trgm", "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_where=text("is_delete = false"),
+        ),
+    )
+    # Lấy giá trị server_default/onupdate bằng RETURNING ngay trong câu INSERT/UPDATE, không cần refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
     name = Column(String(300), nullable=False)
@@ -18,7 +37,22 @@ class Product(Base):
     
     popularity = Column(Integer, nullable=True)
     discount_percentage = Column(Integer, nullable=True, default=0)
+
+    # Tổng hợp từ các tùy chọn (product_options), được cập nhật trong cùng transaction mỗi khi tùy chọn
+    # hoặc giá trị tùy chọn thay đổi (xem app/repository/product_repository.py) nên đọc/sắp xếp theo giá không cần join
+    min_price = Column(Numeric(precision=10, scale=2), nullable=True)
+    max_price = Column(Numeric(precision=10, scale=2), nullable=True)
+    total_stock = Column(Integer, nullable=False, server_default=text("0"))
+    option_count = Column(Integer, nullable=False, server_default=text("0"))
     
+    # Vector tìm kiếm do PostgreSQL sinh ra: tên (trọng số A) được ưu tiên hơn mô tả (trọng số B).
+    # Dùng cấu hình 'simple' vì PostgreSQL không có từ điển tiếng Việt; deferred để không tải cột này khi đọc sản phẩm
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')",
+        persisted=True,
+    )))
+
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
     
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.core.database import Base
+
+class ProductAttribute(Base):
+    __tablename__ = "product_attributes"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
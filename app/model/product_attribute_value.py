@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.core.database import Base
+
+class ProductAttributeValue(Base):
+    __tablename__ = "product_attribute_values"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    product_attribute_id = Column(Integer, ForeignKey("product_attributes.id"), nullable=False, index=True)
+    value = Column(String(255), nullable=False)
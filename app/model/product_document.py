@@ -0,0 +1,12 @@
+from sqlalchemy import Column, BigInteger, TIMESTAMP, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ProductDocument(Base):
+    """DTO của sản phẩm (đúng dạng ProductService.to_dto) được tạo sẵn khi ghi, để trang chi tiết chỉ cần đọc một dòng."""
+    __tablename__ = "product_documents"
+
+    product_id = Column(BigInteger, ForeignKey("products.id"), primary_key=True)
+    body = Column(JSONB, nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -6,7 +6,7 @@ class ProductOption(Base):
     __tablename__ = "product_options"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     price = Column(Numeric(precision=10, scale=2), nullable=True)
     stock = Column(Integer, nullable=False)
 
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class ProductOptionValue(Base):
+    __tablename__ = "product_option_values"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    product_option_id = Column(Integer, ForeignKey("product_options.id"), nullable=False, index=True)
+    product_attribute_value_id = Column(Integer, ForeignKey("product_attribute_values.id"), nullable=False, index=True)
+    # Giá trị thuộc tính ứng với tùy chọn (ví dụ: màu "Đỏ", kích thước "XL")
+    product_attribute_value = relationship("ProductAttributeValue")
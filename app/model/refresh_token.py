@@ -5,6 +5,8 @@ from app.core.database import Base
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    # Lấy giá trị server_default/onupdate bằng RETURNING ngay trong câu INSERT/UPDATE, không cần refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(String(64), primary_key=True, unique=True)
-    expires_at = Column(DateTime, nullable=False, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
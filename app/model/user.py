@@ -1,9 +1,15 @@
-from sqlalchemy import Column, BigInteger, String, Boolean, TIMESTAMP
+from sqlalchemy import Column, BigInteger, String, Boolean, TIMESTAMP, Index, text
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Danh sách user đang hoạt động, sắp xếp/phân trang theo id
+        Index("ix_users_active_id", "id", postgresql_where=text("is_active = true")),
+    )
+    # Lấy giá trị server_default/onupdate bằng RETURNING ngay trong câu INSERT/UPDATE, không cần refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
     username = Column(String(20), nullable=False, unique=True, index=True)
@@ -0,0 +1,76 @@
+from sqlalchemy.future import select
+from sqlalchemy import or_, case, true, false
+from app.model.permission import Permission
+from app.model.user_permission import UserPermission
+from app.model.group_permission import GroupPermission
+from app.model.group_member import GroupMember
+from app.core.database import get_session
+
+
+class AuthorizationRepository:
+    async def resolve_permission(
+        self,
+        user_id: int,
+        permission_name: str,
+        target_id: int | None = None,
+        is_user_owned: bool = False
+    ) -> bool | None:
+        """
+        Quyết định quyền của user bằng một câu SQL duy nhất (join user_permissions, group_members,
+        group_permissions và permissions), áp dụng record_enabled, is_denied và target_id ngay trong SQL.
+        Thứ tự ưu tiên: user deny > user allow > tài nguyên thuộc về user > group allow > quyền mặc định.
+        Trả về None nếu quyền không tồn tại.
+        """
+        def target_matches(column):
+            # Bản ghi theo target cụ thể được xếp trước bản ghi toàn cục (NULLS LAST)
+            if target_id is None:
+                return column.is_(None)
+            return or_(column == target_id, column.is_(None))
+
+        user_decision = (
+            select(case((UserPermission.is_denied, -1), else_=1))
+            .where(
+                UserPermission.user_id == user_id,
+                UserPermission.permission_id == Permission.id,
+                UserPermission.record_enabled == True,
+                target_matches(UserPermission.target_id),
+            )
+            .order_by(UserPermission.target_id.asc().nulls_last(), UserPermission.id.asc())
+            .limit(1)
+            .correlate(Permission)
+            .scalar_subquery()
+        )
+
+        # Quyết định riêng của từng group mà user thuộc về
+        group_decision = (
+            select(case((GroupPermission.is_denied, -1), else_=1))
+            .where(
+                GroupPermission.group_id == GroupMember.group_id,
+                GroupPermission.permission_id == Permission.id,
+                GroupPermission.record_enabled == True,
+                target_matches(GroupPermission.target_id),
+            )
+            .order_by(GroupPermission.target_id.asc().nulls_last(), GroupPermission.id.asc())
+            .limit(1)
+            .correlate(GroupMember, Permission)
+            .scalar_subquery()
+        )
+        group_allowed = (
+            select(GroupMember.group_id)
+            .where(GroupMember.user_id == user_id, group_decision == 1)
+            .correlate(Permission)
+            .exists()
+        )
+
+        if is_user_owned:
+            fallback = true()
+        else:
+            fallback = case((group_allowed, true()), else_=Permission.default)
+        # CASE <quyết định của user> WHEN -1 ... WHEN 1 ... ELSE ...: subquery của user chỉ được tính một lần
+        decision = case({-1: false(), 1: true()}, value=user_decision, else_=fallback)
+
+        async with get_session() as session:
+            result = await session.execute(
+                select(decision).where(Permission.name == permission_name)
+            )
+            return result.scalar_one_or_none()
@@ -1,6 +1,7 @@
 from sqlalchemy.future import select
+from sqlalchemy import delete
 from app.model.blacklist_token import BlacklistToken
-from app.core.database import AsyncSessionLocal
+from app.core.database import get_session
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 
@@ -9,24 +10,31 @@ class BlacklistTokenRepository:
 
     async def add_token(self, token: BlacklistToken):
         """ Thêm token vào danh sách blacklist """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             session.add(token)
             await session.commit()
-            await session.refresh(token)
             return token
 
     async def is_token_blacklisted(self, token_id: str) -> bool:
         """ Kiểm tra token có trong blacklist """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             result = await session.execute(
                 select(BlacklistToken).where(BlacklistToken.id == token_id)
             )
             token = result.scalar_one_or_none()
             return token is not None
 
+    async def find_active_tokens(self) -> list[BlacklistToken]:
+        """ Lấy các token trong blacklist chưa hết hạn """
+        async with get_session() as session:
+            result = await session.execute(
+                select(BlacklistToken).where(BlacklistToken.expires_at >= datetime.utcnow())
+            )
+            return result.scalars().all()
+
     async def delete_token(self, token_id: str):
         """ Xóa token khỏi blacklist """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             token = await session.get(BlacklistToken, token_id)
             if token:
                 await session.delete(token)
@@ -34,11 +42,11 @@ class BlacklistTokenRepository:
 
     async def delete_expired_tokens(self):
         """ Xóa tất cả token đã hết hạn """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             try:
-                await session.execute(
-                    f"DELETE FROM blacklist_tokens WHERE expires_at < '{datetime.utcnow().isoformat()}'"
-                )
+                # Savepoint: dọn dẹp thất bại không hoàn tác các thay đổi khác của request
+                async with session.begin_nested():
+                    await session.execute(delete(BlacklistToken).where(BlacklistToken.expires_at < datetime.utcnow()))
                 await session.commit()
             except SQLAlchemyError:
-                await session.rollback()
+                pass
@@ -5,7 +5,7 @@ from sqlalchemy.orm import joinedload  # Import joinedload
 from app.model.group_member import GroupMember
 from app.model.group import Group  # Import Group model
 from app.model.user import User  # Import User model
-from app.core.database import AsyncSessionLocal
+from app.core.database import get_session
 from app.core.exceptions import DuplicateDataError
 
 class GroupMemberRepository:
@@ -13,27 +13,28 @@ class GroupMemberRepository:
         """
         Thêm một GroupMember mới vào cơ sở dữ liệu với xử lý lỗi trùng dữ liệu.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             try:
-                session.add(group_member)
+                # Savepoint: lỗi trùng dữ liệu chỉ hoàn tác câu INSERT này, không hoàn tác transaction của request
+                async with session.begin_nested():
+                    session.add(group_member)
                 await session.commit()
-                await session.refresh(group_member)
                 return group_member
             except IntegrityError:
-                await session.rollback()
                 raise DuplicateDataError("User is already a member of the group")
 
     async def delete(self, group_member: GroupMember) -> bool:
         """
         Xóa một GroupMember khỏi cơ sở dữ liệu và trả về True nếu thành công, False nếu thất bại.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             try:
-                await session.delete(group_member)
+                # Savepoint: xóa thất bại (ví dụ vi phạm khóa ngoại) chỉ hoàn tác câu DELETE này
+                async with session.begin_nested():
+                    await session.delete(group_member)
                 await session.commit()
                 return True
             except SQLAlchemyError:
-                await session.rollback()
                 return False
 
     async def find_by_user_and_group(self, user, group) -> GroupMember:
@@ -41,7 +42,7 @@ class GroupMemberRepository:
         Tìm kiếm một GroupMember dựa vào User và Group.
         Giả sử user và group đều có thuộc tính `id`.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(GroupMember).where(
                     GroupMember.user_id == user.id,
@@ -54,7 +55,7 @@ class GroupMemberRepository:
         """
         Tìm danh sách GroupMember (bao gồm cả Group) mà User thuộc về.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(GroupMember)
                 .where(GroupMember.user_id == user.id)
@@ -66,7 +67,7 @@ class GroupMemberRepository:
         """
         Tìm danh sách GroupMember (bao gồm cả User) của một Group.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(GroupMember)
                 .where(GroupMember.group_id == group.id)
@@ -78,7 +79,7 @@ class GroupMemberRepository:
         """
         Kiểm tra xem một User có thuộc về một Group không.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(func.count(GroupMember.id)).where(
                     GroupMember.user_id == user.id,
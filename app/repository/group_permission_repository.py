@@ -4,7 +4,8 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.dialects.postgresql import insert
 from app.model.permission import Permission
 from app.model.group_permission import GroupPermission
-from app.core.database import AsyncSessionLocal
+from app.model.group_member import GroupMember
+from app.core.database import get_session
 
 
 class GroupPermissionRepository:
@@ -13,7 +14,7 @@ class GroupPermissionRepository:
         Lấy danh sách GroupPermission theo group_id và permission_name,
         ưu tiên bản ghi có target_id = None (sắp xếp theo target_id ASC).
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             result = await session.execute(
                 select(GroupPermission)
                 .join(Permission, GroupPermission.permission_id == Permission.id)
@@ -23,11 +24,27 @@ class GroupPermissionRepository:
             )
             return result.scalars().all()
 
+    async def find_enabled_grants_by_user(self, user_id: int) -> list[tuple]:
+        """
+        Lấy các bản ghi quyền đang bật của mọi group mà user thuộc về,
+        dưới dạng (group_id, permission_name, target_id, is_denied).
+        """
+        async with get_session() as session:
+            result = await session.execute(
+                select(GroupPermission.group_id, Permission.name, GroupPermission.target_id, GroupPermission.is_denied)
+                .join(Permission, GroupPermission.permission_id == Permission.id)
+                .join(GroupMember, GroupMember.group_id == GroupPermission.group_id)
+                .where(GroupMember.user_id == user_id)
+                .where(GroupPermission.record_enabled == True)
+                .order_by(asc(GroupPermission.target_id).nulls_last(), GroupPermission.id.asc())
+            )
+            return result.all()
+
     async def find_by_group_id(self, group_id: int) -> list[GroupPermission]:
         """
         Lấy danh sách GroupPermission theo group_id, sắp xếp theo id (tăng dần).
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(GroupPermission)
                 .where(GroupPermission.group_id == group_id)
@@ -39,32 +56,30 @@ class GroupPermissionRepository:
         """
         Thêm nhiều bản ghi GroupPermission cùng lúc, bỏ qua các bản ghi trùng lặp dựa theo unique constraint.
         """
-        async with AsyncSessionLocal() as session:
-            try:
-                records = [
-                    {
-                        "group_id": gp.group_id,
-                        "permission_id": gp.permission_id,
-                        "target_id": gp.target_id,
-                        "record_enabled": gp.record_enabled,
-                        "is_denied": gp.is_denied
-                    }
-                    for gp in group_permissions
-                ]
-                stmt = insert(GroupPermission).values(records)
-                stmt = stmt.on_conflict_do_nothing(index_elements=["group_id", "permission_id", "target_id"])
+        async with get_session() as session:
+            records = [
+                {
+                    "group_id": gp.group_id,
+                    "permission_id": gp.permission_id,
+                    "target_id": gp.target_id,
+                    "record_enabled": gp.record_enabled,
+                    "is_denied": gp.is_denied
+                }
+                for gp in group_permissions
+            ]
+            stmt = insert(GroupPermission).values(records)
+            stmt = stmt.on_conflict_do_nothing(index_elements=["group_id", "permission_id", "target_id"])
+            # Savepoint: nếu lỗi chỉ hoàn tác câu INSERT này rồi báo lỗi cho tầng trên
+            async with session.begin_nested():
                 await session.execute(stmt)
-                await session.commit()
-            except SQLAlchemyError:
-                await session.rollback()
-                raise
+            await session.commit()
 
     async def bulk_update(self, group_permissions: list[GroupPermission]) -> None:
         """
         Cập nhật nhiều bản ghi GroupPermission cùng lúc.
         Sử dụng session.merge để đảm bảo đối tượng được cập nhật đúng trong session mới.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             for gp in group_permissions:
                 await session.merge(gp)
             await session.commit()
@@ -72,19 +87,17 @@ class GroupPermissionRepository:
     async def bulk_delete(self, group_permissions: list[GroupPermission]) -> list[GroupPermission]:
         """
         Xóa nhiều bản ghi GroupPermission cùng lúc.
-        Nếu có bản ghi lỗi, nó sẽ không bị xóa nhưng các bản ghi hợp lệ khác vẫn được xóa.
+        Mỗi bản ghi được xóa trong một savepoint riêng: bản ghi lỗi không bị xóa (chỉ savepoint của nó bị hoàn tác)
+        nhưng các bản ghi hợp lệ khác vẫn được xóa.
         Trả về danh sách các bản ghi bị lỗi khi xóa.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             failed_deletes = []
-            try:
-                for gp in group_permissions:
-                    try:
+            for gp in group_permissions:
+                try:
+                    async with session.begin_nested():
                         await session.delete(gp)
-                    except SQLAlchemyError:
-                        failed_deletes.append(gp)
-                await session.commit()
-            except SQLAlchemyError:
-                await session.rollback()
-                raise
+                except SQLAlchemyError:
+                    failed_deletes.append(gp)
+            await session.commit()
         return failed_deletes
@@ -1,18 +1,20 @@
 from sqlalchemy.future import select
+from sqlalchemy import delete, or_, literal_column
+from sqlalchemy.dialects.postgresql import insert
 from app.model.permission import Permission
-from app.core.database import AsyncSessionLocal
+from app.core.database import get_session
 
 
 class PermissionRepository:
     async def find_all(self) -> list:
         """Lấy tất cả các bản ghi Permission."""
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             result = await session.execute(select(Permission))
             return result.scalars().all()
 
     async def find(self, id: int) -> Permission:
         """Tìm Permission theo ID."""
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(Permission).where(Permission.id == id)
             )
@@ -23,7 +25,7 @@ class PermissionRepository:
         Tìm một Permission theo các tiêu chí được cung cấp trong dictionary filters.
         Ví dụ: filters = {"name": "view_users"}
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             query = select(Permission)
             for attr, value in filters.items():
                 query = query.where(getattr(Permission, attr) == value)
@@ -34,27 +36,62 @@ class PermissionRepository:
         """
         Thêm mới một Permission vào cơ sở dữ liệu.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             session.add(permission)
             await session.commit()
-            await session.refresh(permission)
         return permission
 
     async def update(self, permission: Permission) -> Permission:
         """
         Cập nhật một Permission đã có trong cơ sở dữ liệu.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             session.add(permission)
             await session.commit()
-            await session.refresh(permission)
         return permission
 
     async def delete(self, permission: Permission) -> None:
         """
         Xóa một Permission khỏi cơ sở dữ liệu.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             await session.delete(permission)
             await session.commit()
 
+    async def sync(self, permissions: dict[str, tuple[str, bool]]) -> dict[str, list[str]]:
+        """
+        Đồng bộ bảng permissions với danh sách permissions (name -> (description, default)) trong một transaction:
+        - Một câu INSERT ... ON CONFLICT (name) DO UPDATE cho toàn bộ danh sách, chỉ cập nhật các dòng thực sự thay đổi.
+        - Một câu DELETE cho các quyền không còn trong danh sách.
+        Trả về tên các quyền đã được tạo, cập nhật và xóa.
+        """
+        report = {"created": [], "updated": [], "deleted": []}
+        async with get_session() as session:
+            if permissions:
+                stmt = insert(Permission).values([
+                    {"name": name, "description": description, "default": default}
+                    for name, (description, default) in permissions.items()
+                ])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Permission.name],
+                    set_={"description": stmt.excluded.description, "default": stmt.excluded.default},
+                    where=or_(
+                        Permission.description.is_distinct_from(stmt.excluded.description),
+                        Permission.default.is_distinct_from(stmt.excluded.default),
+                    ),
+                ).returning(
+                    Permission.name,
+                    # xmax = 0: dòng vừa được INSERT, ngược lại là dòng được UPDATE
+                    literal_column("xmax = 0").label("inserted"),
+                )
+                for name, inserted in (await session.execute(stmt)).all():
+                    report["created" if inserted else "updated"].append(name)
+
+            result = await session.execute(
+                delete(Permission)
+                .where(Permission.name.not_in(list(permissions)))
+                .returning(Permission.name)
+            )
+            report["deleted"] = list(result.scalars().all())
+            await session.commit()
+        return report
@@ -0,0 +1,39 @@
+from sqlalchemy.future import select
+from app.model.product_attribute import ProductAttribute
+from app.core.database import get_session
+
+
+class ProductAttributeRepository:
+    async def find_by_product_id(self, product_id: int) -> list[ProductAttribute]:
+        """Lấy thuộc tính của một sản phẩm, sắp xếp theo id"""
+        return await self.find_by_product_ids([product_id])
+
+    async def find_by_product_ids(self, product_ids: list[int]) -> list[ProductAttribute]:
+        """Lấy thuộc tính của nhiều sản phẩm bằng một câu truy vấn IN (...), sắp xếp theo id"""
+        if not product_ids:
+            return []
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(ProductAttribute)
+                .where(ProductAttribute.product_id.in_(product_ids))
+                .order_by(ProductAttribute.id)
+            )
+            return result.scalars().all()
+
+    async def find_by_name_and_product_id(self, name: str, product_id: int) -> ProductAttribute | None:
+        """Tìm thuộc tính theo tên trong một sản phẩm"""
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(ProductAttribute)
+                .where(ProductAttribute.product_id == product_id, ProductAttribute.name == name)
+                .order_by(ProductAttribute.id)
+                .limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    async def create(self, attribute: ProductAttribute) -> ProductAttribute:
+        """Tạo mới một thuộc tính sản phẩm"""
+        async with get_session() as session:
+            session.add(attribute)
+            await session.commit()
+            return attribute
@@ -0,0 +1,41 @@
+from sqlalchemy.future import select
+from app.model.product_attribute_value import ProductAttributeValue
+from app.core.database import get_session
+
+
+class ProductAttributeValueRepository:
+    async def find_by_attribute_ids(self, attribute_ids: list[int]) -> list[ProductAttributeValue]:
+        """Lấy giá trị của nhiều thuộc tính bằng một câu truy vấn IN (...), sắp xếp theo id"""
+        if not attribute_ids:
+            return []
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(ProductAttributeValue)
+                .where(ProductAttributeValue.product_attribute_id.in_(attribute_ids))
+                .order_by(ProductAttributeValue.id)
+            )
+            return result.scalars().all()
+
+    async def find_by_value_and_attribute_id(self, value: str, attribute_id: int) -> ProductAttributeValue | None:
+        """Tìm giá trị của một thuộc tính theo nội dung"""
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(ProductAttributeValue)
+                .where(ProductAttributeValue.product_attribute_id == attribute_id, ProductAttributeValue.value == value)
+                .order_by(ProductAttributeValue.id)
+                .limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    async def save(self, attribute_value: ProductAttributeValue) -> ProductAttributeValue:
+        """Tạo mới hoặc cập nhật một giá trị thuộc tính"""
+        async with get_session() as session:
+            session.add(attribute_value)
+            await session.commit()
+            return attribute_value
+
+    async def delete(self, attribute_value: ProductAttributeValue) -> None:
+        """Xóa một giá trị thuộc tính"""
+        async with get_session() as session:
+            await session.delete(attribute_value)
+            await session.commit()
@@ -0,0 +1,32 @@
+from sqlalchemy.future import select
+from sqlalchemy import Text, cast, func, delete
+from sqlalchemy.dialects.postgresql import insert
+from app.model.product_document import ProductDocument
+from app.core.database import get_session
+
+
+class ProductDocumentRepository:
+    async def find_body(self, product_id: int) -> str | None:
+        """Lấy document của sản phẩm dưới dạng chuỗi JSON (không giải mã/mã hóa lại ở phía ứng dụng)"""
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(cast(ProductDocument.body, Text)).where(ProductDocument.product_id == product_id)
+            )
+            return result.scalar_one_or_none()
+
+    async def save(self, product_id: int, body: dict) -> None:
+        """Tạo mới hoặc ghi đè document của sản phẩm (INSERT ... ON CONFLICT DO UPDATE)"""
+        async with get_session() as session:
+            stmt = insert(ProductDocument).values(product_id=product_id, body=body)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProductDocument.product_id],
+                set_={"body": stmt.excluded.body, "updated_at": func.now()},
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    async def delete(self, product_id: int) -> None:
+        """Xóa document của sản phẩm (nếu có)"""
+        async with get_session() as session:
+            await session.execute(delete(ProductDocument).where(ProductDocument.product_id == product_id))
+            await session.commit()
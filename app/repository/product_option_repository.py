@@ -0,0 +1,25 @@
+from sqlalchemy.future import select
+from app.model.product_option import ProductOption
+from app.core.database import get_session
+
+
+class ProductOptionRepository:
+    async def find_by_product_id(self, product_id: int) -> list[ProductOption]:
+        """Lấy các tùy chọn của một sản phẩm, sắp xếp theo id"""
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(ProductOption)
+                .where(ProductOption.product_id == product_id)
+                .order_by(ProductOption.id)
+            )
+            return result.scalars().all()
+
+    async def save(self, option: ProductOption) -> ProductOption:
+        """
+        Tạo mới hoặc cập nhật một tùy chọn.
+        Cột tổng hợp giá/tồn kho của sản phẩm được cập nhật trong cùng flush (xem product_repository).
+        """
+        async with get_session() as session:
+            session.add(option)
+            await session.commit()
+            return option
@@ -0,0 +1,42 @@
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+from app.model.product_option_value import ProductOptionValue
+from app.core.database import get_session
+
+
+class ProductOptionValueRepository:
+    async def find_by_option_id(self, option_id: int) -> list[ProductOptionValue]:
+        """Lấy các giá trị của một tùy chọn (kèm giá trị thuộc tính)"""
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(ProductOptionValue)
+                .where(ProductOptionValue.product_option_id == option_id)
+                .options(joinedload(ProductOptionValue.product_attribute_value))
+                .order_by(ProductOptionValue.id)
+            )
+            return result.scalars().all()
+
+    async def find_by_attribute_value_and_option_id(
+        self,
+        attribute_value_id: int,
+        option_id: int
+    ) -> ProductOptionValue | None:
+        """Tìm liên kết giữa một tùy chọn và một giá trị thuộc tính"""
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(ProductOptionValue).where(
+                    ProductOptionValue.product_option_id == option_id,
+                    ProductOptionValue.product_attribute_value_id == attribute_value_id,
+                )
+            )
+            return result.scalars().first()
+
+    async def create(self, option_value: ProductOptionValue) -> ProductOptionValue:
+        """
+        Liên kết một tùy chọn với một giá trị thuộc tính.
+        Cột tổng hợp giá/tồn kho của sản phẩm được cập nhật trong cùng flush (xem product_repository).
+        """
+        async with get_session() as session:
+            session.add(option_value)
+            await session.commit()
+            return option_value
@@ -1,50 +1,133 @@
+from itertools import chain
 from sqlalchemy.future import select
-from sqlalchemy import or_
+from sqlalchemy import or_, and_, event, text, bindparam, inspect, func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm.attributes import set_committed_value
 from app.model.product import Product
-from app.core.database import AsyncSessionLocal
+from app.model.product_option import ProductOption
+from app.model.product_option_value import ProductOptionValue
+from app.core.database import get_session, AppSession
+from app.core.pagination import keyset_clause
+from app.core.config import PRODUCT_SEARCH_MAX_CANDIDATES
+from app.core.permission_scope import PermissionScope
 
 
 class ProductRepository:
     async def find_by_category_id(self, category_id: int) -> list:
         """Lấy danh sách sản phẩm theo ID danh mục"""
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(Product).where(Product.category_id == category_id)
             )
             return result.scalars().all()
 
-    async def find_all_paginated(self, page: int, limit: int) -> list:
-        """Lấy danh sách sản phẩm không bị xóa với phân trang"""
-        offset = (page - 1) * limit
-        async with AsyncSessionLocal() as session:
+    async def find_all_paginated(
+        self,
+        page: int,
+        limit: int,
+        scope: PermissionScope | None = None,
+        after: tuple | None = None,
+        sort: str = "id"
+    ) -> list:
+        """
+        Lấy danh sách sản phẩm không bị xóa với phân trang, lọc theo phạm vi quyền (nếu có).
+        sort: "id" hoặc "price" (giá thấp nhất tăng dần, sản phẩm chưa có giá xếp cuối), chỉ đọc bảng products.
+        after: giá trị cột sắp xếp của dòng cuối trang trước, (id,) hoặc (min_price, id),
+        khi phân trang theo cursor (keyset, bỏ qua page).
+        Trả về tối đa limit + 1 dòng để biết còn trang sau hay không.
+        """
+        query = select(Product).where(Product.is_delete == False)
+        if scope is not None:
+            query = query.where(scope.as_clause(Product.id))
+        if sort == "price":
+            order_by = [Product.min_price.asc().nulls_last(), Product.id.asc()]
+            if after is not None:
+                query = query.where(self._after_price(*after))
+        else:
+            order_by = [Product.id.asc()]
+            if after is not None:
+                query = query.where(keyset_clause([Product.id], after))
+        if after is None:
+            query = query.offset((page - 1) * limit)
+        async with get_session(read_only=True) as session:
             result = await session.execute(
-                select(Product)
-                .where(Product.is_delete == False)
-                .order_by(Product.id.asc())
-                .offset(offset)
-                .limit(limit)
+                query
+                .order_by(*order_by)
+                .limit(limit + 1)
             )
             return result.scalars().all()
 
-    async def search_products_by_keywords(self, keywords: str) -> list:
-        """Tìm sản phẩm theo từ khóa (trong tên hoặc mô tả)"""
-        async with AsyncSessionLocal() as session:
+    @staticmethod
+    def _after_price(min_price, product_id):
+        """Điều kiện keyset cho thứ tự (min_price NULLS LAST, id)."""
+        if min_price is None:
+            return and_(Product.min_price.is_(None), Product.id > product_id)
+        return or_(
+            keyset_clause([Product.min_price, Product.id], (min_price, product_id)),
+            Product.min_price.is_(None),
+        )
+
+    async def search_products_by_keywords(
+        self,
+        keywords: str,
+        page: int = 1,
+        limit: int = 20
+    ) -> tuple[list, int | None]:
+        """
+        Tìm sản phẩm chưa xóa theo từ khóa (tên hoặc mô tả) bằng tìm kiếm toàn văn (index GIN trên search_vector).
+        Cú pháp từ khóa như công cụ tìm kiếm web: "cụm từ", OR, -loại_trừ. Kết quả xếp theo độ liên quan rồi theo id;
+        chỉ PRODUCT_SEARCH_MAX_CANDIDATES kết quả liên quan nhất được phân trang.
+        Trả về (danh sách sản phẩm, tổng số sản phẩm khớp); tổng là None nếu trang nằm ngoài kết quả (không có dòng nào để đọc).
+        """
+        query = func.websearch_to_tsquery(literal("simple", REGCONFIG), keywords)
+        rank = func.ts_rank_cd(Product.search_vector, query)
+        # Xếp hạng trước khi cắt: LIMIT giữ đúng các kết quả liên quan nhất; count() OVER () được tính trước LIMIT
+        candidates = (
+            select(Product.id, rank.label("rank"), func.count().over().label("total"))
+            .where(Product.is_delete == False)
+            .where(Product.search_vector.op("@@")(query))
+            .order_by(rank.desc(), Product.id.asc())
+            .limit(PRODUCT_SEARCH_MAX_CANDIDATES)
+            .subquery()
+        )
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(Product, candidates.c.total)
+                .join(candidates, Product.id == candidates.c.id)
+                .order_by(candidates.c.rank.desc(), Product.id.asc())
+                .offset((page - 1) * limit)
+                .limit(limit)
+            )
+            rows = result.all()
+        if rows:
+            return [product for product, _ in rows], rows[0].total
+        return [], 0 if page == 1 else None
+
+    async def suggest_names(self, prefix: str, limit: int) -> list[tuple[int, str]]:
+        """
+        Gợi ý (id, name) của sản phẩm chưa xóa cho chuỗi người dùng đang nhập (index GIN pg_trgm trên name):
+        tên bắt đầu bằng chuỗi được xếp trước, sau đó là tên gần giống (word_similarity, chịu được gõ sai).
+        """
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        starts_with = Product.name.ilike(f"{escaped}%", escape="\\")
+        similar = literal(prefix).op("<%")(Product.name)
+        async with get_session(read_only=True) as session:
             result = await session.execute(
-                select(Product)
+                select(Product.id, Product.name)
                 .where(Product.is_delete == False)
-                .where(
-                    or_(
-                        Product.name.ilike(f"%{keywords}%"),
-                        Product.description.ilike(f"%{keywords}%")
-                    )
+                .where(or_(starts_with, similar))
+                .order_by(
+                    starts_with.desc(),
+                    func.word_similarity(prefix, Product.name).desc(),
+                    Product.id.asc(),
                 )
-                .order_by(Product.id.asc())
+                .limit(limit)
             )
-            return result.scalars().all()
+            return result.all()
 
     async def find_by_id(self, product_id: int):
         """Tìm sản phẩm theo ID"""
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(Product).where(Product.id == product_id)
             )
@@ -52,7 +135,7 @@ class ProductRepository:
 
     async def find_all(self) -> list:
         """Lấy tất cả sản phẩm"""
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(select(Product))
             return result.scalars().all()
 
@@ -60,19 +143,88 @@ class ProductRepository:
 
     async def create(self, product: Product) -> Product:
         """Tạo mới một sản phẩm trong cơ sở dữ liệu"""
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             session.add(product)
             await session.commit()
-            await session.refresh(product)
             return product
 
     async def update(self, product: Product) -> Product:
         """
         Cập nhật thông tin của sản phẩm.
-        Ở đây, chúng ta add lại đối tượng (có thể đã được thay đổi) rồi commit và refresh.
+        Ở đây, chúng ta add lại đối tượng (có thể đã được thay đổi) rồi commit; updated_at được lấy về bằng RETURNING.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             session.add(product)
             await session.commit()
-            await session.refresh(product)
             return product
+
+
+# Tính lại cột tổng hợp của sản phẩm từ các tùy chọn. Quy tắc giống cách tính giá/tồn kho trước đây:
+# sản phẩm chỉ có một tùy chọn thì dùng tùy chọn đó, ngược lại chỉ tính các tùy chọn có giá trị thuộc tính.
+_REFRESH_SUMMARY = text("""
+    UPDATE products AS p
+    SET min_price = s.min_price, max_price = s.max_price, total_stock = s.total_stock, option_count = s.option_count
+    FROM (
+        SELECT pr.id AS product_id,
+               min(o.price) FILTER (WHERE o.valid) AS min_price,
+               max(o.price) FILTER (WHERE o.valid) AS max_price,
+               coalesce(sum(o.stock) FILTER (WHERE o.valid), 0) AS total_stock,
+               count(o.id) AS option_count
+        FROM products AS pr
+        LEFT JOIN LATERAL (
+            SELECT po.id, po.price, po.stock,
+                   count(*) OVER () = 1
+                   OR EXISTS (SELECT 1 FROM product_option_values AS v WHERE v.product_option_id = po.id) AS valid
+            FROM product_options AS po
+            WHERE po.product_id = pr.id
+        ) AS o ON true
+        WHERE pr.id IN :product_ids
+        GROUP BY pr.id
+    ) AS s
+    WHERE p.id = s.product_id
+    RETURNING p.id, p.min_price, p.max_price, p.total_stock, p.option_count
+""").bindparams(bindparam("product_ids", expanding=True))
+
+
+def _changed_ids(obj, column: str) -> set:
+    """Giá trị hiện tại và giá trị cũ (nếu vừa bị đổi) của một cột khóa ngoại."""
+    history = inspect(obj).attrs[column].history
+    return {value for value in chain(history.added, history.unchanged, history.deleted) if value is not None}
+
+
+_SUMMARY_SOURCES = (ProductOption, ProductOptionValue)
+
+
+@event.listens_for(AppSession, "after_flush")
+def _refresh_product_summaries(session, flush_context):
+    """
+    Sau mỗi lần flush có thay đổi ProductOption/ProductOptionValue: cập nhật cột tổng hợp của các sản phẩm liên quan
+    trên cùng connection, nên nằm trong cùng transaction với thay đổi (commit/rollback cùng nhau).
+    Giá trị mới được gán lại cho các Product đang có trong session để đọc ngay không cần refresh.
+    Flush không chạm tới tùy chọn sản phẩm chỉ tốn một lượt duyệt các đối tượng thay đổi, không chạy câu SQL nào.
+    """
+    changed = [obj for obj in chain(session.new, session.dirty, session.deleted) if isinstance(obj, _SUMMARY_SOURCES)]
+    if not changed:
+        return
+
+    product_ids, option_ids = set(), set()
+    for obj in changed:
+        if isinstance(obj, ProductOption):
+            product_ids |= _changed_ids(obj, "product_id")
+        else:
+            option_ids |= _changed_ids(obj, "product_option_id")
+
+    connection = session.connection()
+    if option_ids:
+        result = connection.execute(
+            select(ProductOption.product_id).where(ProductOption.id.in_(option_ids))
+        )
+        product_ids |= set(result.scalars().all())
+    if not product_ids:
+        return
+    result = connection.execute(_REFRESH_SUMMARY, {"product_ids": sorted(product_ids)})
+    for row in result:
+        product = session.identity_map.get(inspect(Product).identity_key_from_primary_key([row.id]))
+        if product is not None:
+            for column in ("min_price", "max_price", "total_stock", "option_count"):
+                set_committed_value(product, column, getattr(row, column))
@@ -4,7 +4,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.dialects.postgresql import insert
 from app.model.permission import Permission
 from app.model.user_permission import UserPermission
-from app.core.database import AsyncSessionLocal
+from app.core.database import get_session
 from app.core.exceptions import NotFoundError
 
 
@@ -14,7 +14,7 @@ class UserPermissionRepository:
         Lấy danh sách UserPermission theo user_id và permission_name,
         ưu tiên bản ghi có target_id = None (sắp xếp theo target_id ASC).
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             result = await session.execute(
                 select(UserPermission)
                 .join(Permission, UserPermission.permission_id == Permission.id)
@@ -24,11 +24,26 @@ class UserPermissionRepository:
             )
             return result.scalars().all()
 
+    async def find_enabled_grants_by_user(self, user_id: int) -> list[tuple]:
+        """
+        Lấy các bản ghi quyền đang bật của user dưới dạng (permission_name, target_id, is_denied),
+        bản ghi có target_id cụ thể đứng trước bản ghi toàn cục (target_id = None).
+        """
+        async with get_session() as session:
+            result = await session.execute(
+                select(Permission.name, UserPermission.target_id, UserPermission.is_denied)
+                .join(Permission, UserPermission.permission_id == Permission.id)
+                .where(UserPermission.user_id == user_id)
+                .where(UserPermission.record_enabled == True)
+                .order_by(asc(UserPermission.target_id).nulls_last(), UserPermission.id.asc())
+            )
+            return result.all()
+
     async def find_by_user_id(self, user_id: int) -> list[UserPermission]:
         """
         Lấy danh sách UserPermission theo user_id, sắp xếp theo id (tăng dần).
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(
                 select(UserPermission)
                 .where(UserPermission.user_id == user_id)
@@ -40,34 +55,32 @@ class UserPermissionRepository:
         """
         Thêm nhiều bản ghi UserPermission cùng lúc, bỏ qua các bản ghi trùng lặp dựa theo unique constraint.
         """
-        async with AsyncSessionLocal() as session:
-            try:
-                # Chuyển danh sách đối tượng thành danh sách dict
-                records = [
-                    {
-                        "user_id": up.user_id,
-                        "permission_id": up.permission_id,
-                        "target_id": up.target_id,
-                        "record_enabled": up.record_enabled,
-                        "is_denied": up.is_denied
-                    }
-                    for up in user_permissions
-                ]
-                stmt = insert(UserPermission).values(records)
-                # Xác định các cột để kiểm tra xung đột và bỏ qua nếu đã tồn tại
-                stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "permission_id", "target_id"])
+        async with get_session() as session:
+            # Chuyển danh sách đối tượng thành danh sách dict
+            records = [
+                {
+                    "user_id": up.user_id,
+                    "permission_id": up.permission_id,
+                    "target_id": up.target_id,
+                    "record_enabled": up.record_enabled,
+                    "is_denied": up.is_denied
+                }
+                for up in user_permissions
+            ]
+            stmt = insert(UserPermission).values(records)
+            # Xác định các cột để kiểm tra xung đột và bỏ qua nếu đã tồn tại
+            stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "permission_id", "target_id"])
+            # Savepoint: nếu lỗi chỉ hoàn tác câu INSERT này rồi báo lỗi cho tầng trên
+            async with session.begin_nested():
                 await session.execute(stmt)
-                await session.commit()
-            except SQLAlchemyError:
-                await session.rollback()
-                raise
+            await session.commit()
 
     async def bulk_update(self, user_permissions: list[UserPermission]) -> None:
         """
         Cập nhật nhiều bản ghi UserPermission cùng lúc.
         Sử dụng session.merge để đảm bảo đối tượng được cập nhật đúng trong session mới.
         """
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             # try:
             for up in user_permissions:
                 await session.merge(up)
@@ -79,19 +92,17 @@ class UserPermissionRepository:
     async def bulk_delete(self, user_permissions: list[UserPermission]) -> list[UserPermission]:
         """
         Xóa nhiều bản ghi UserPermission cùng lúc.
-        Nếu có bản ghi lỗi, nó sẽ không bị xóa nhưng các bản ghi hợp lệ khác vẫn được xóa.
+        Mỗi bản ghi được xóa trong một savepoint riêng: bản ghi lỗi không bị xóa (chỉ savepoint của nó bị hoàn tác)
+        nhưng các bản ghi hợp lệ khác vẫn được xóa.
         Trả về danh sách các bản ghi bị lỗi khi xóa.
         """
-        async with AsyncSessionLocal() as session:
-            failed_deletes = []  # Danh sách các bản ghi không thể xóa
-            try:
-                for up in user_permissions:
-                    try:
-                        await session.delete(up)  # Xóa từng bản ghi
-                    except SQLAlchemyError:
-                        failed_deletes.append(up)  # Ghi lại bản ghi gây lỗi
-                await session.commit()  # Chỉ commit nếu ít nhất một bản ghi hợp lệ được xóa
-            except SQLAlchemyError:
-                await session.rollback()  # Rollback toàn bộ nếu có lỗi nghiêm trọng
-                raise
+        async with get_session() as session:
+            failed_deletes = []
+            for up in user_permissions:
+                try:
+                    async with session.begin_nested():
+                        await session.delete(up)
+                except SQLAlchemyError:
+                    failed_deletes.append(up)
+            await session.commit()
         return failed_deletes
@@ -1,69 +1,85 @@
 from sqlalchemy.future import select
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.model.user import User
-from app.core.database import AsyncSessionLocal
+from app.core.database import get_session
 from app.core.exceptions import DuplicateDataError
+from app.core.pagination import keyset_clause
+from app.core.permission_scope import PermissionScope
 
 class UserRepository:
 
     async def create_user(self, new_user: User):
         """Tạo mới người dùng với xử lý lỗi trùng dữ liệu"""
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             try:
-                session.add(new_user)
+                # Savepoint: lỗi trùng dữ liệu chỉ hoàn tác câu INSERT này, không hoàn tác transaction của request
+                async with session.begin_nested():
+                    session.add(new_user)
                 await session.commit()
-                await session.refresh(new_user)
                 return new_user
             except IntegrityError:
-                await session.rollback()
                 raise DuplicateDataError("Username hoặc Email đã tồn tại")
 
     async def update_user(self, user: User):
         """Cập nhật thông tin người dùng"""
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             session.add(user)
             await session.commit()
-            await session.refresh(user)
             return user
 
     async def delete_user(self, user: User) -> bool:
         """Xóa người dùng và trả về True nếu thành công, False nếu thất bại"""
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             try:
-                await session.delete(user)
+                # Savepoint: xóa thất bại (ví dụ vi phạm khóa ngoại) chỉ hoàn tác câu DELETE này
+                async with session.begin_nested():
+                    await session.delete(user)
                 await session.commit()
                 return True  # Xóa thành công
             except SQLAlchemyError:
-                await session.rollback()  # Rollback nếu có lỗi
                 return False  # Xóa thất bại
 
-    async def get_active_users_paginated(self, page: int, limit: int):
-        """Lấy danh sách user đang hoạt động (is_active=True) với phân trang"""
-        offset = (page - 1) * limit
-        async with AsyncSessionLocal() as session:
+    async def get_active_users_paginated(
+        self,
+        page: int,
+        limit: int,
+        scope: PermissionScope | None = None,
+        after: tuple | None = None
+    ):
+        """
+        Lấy danh sách user đang hoạt động (is_active=True) với phân trang, lọc theo phạm vi quyền (nếu có).
+        after: giá trị (id,) của dòng cuối trang trước khi phân trang theo cursor (keyset, bỏ qua page).
+        Trả về tối đa limit + 1 dòng để biết còn trang sau hay không.
+        """
+        query = select(User).where(User.is_active == True)
+        if scope is not None:
+            query = query.where(scope.as_clause(User.id))
+        if after is not None:
+            query = query.where(keyset_clause([User.id], after))
+        else:
+            query = query.offset((page - 1) * limit)
+        async with get_session(read_only=True) as session:
             result = await session.execute(
-                select(User)
-                .where(User.is_active == True)
+                query
                 .order_by(User.id.asc())
-                .offset(offset)
-                .limit(limit)
+                .limit(limit + 1)
             )
             return result.scalars().all()
 
     async def get_user_by_id(self, user_id: int) -> User | None:
         """Tìm user theo ID"""
-        async with AsyncSessionLocal() as session:
+        async with get_session() as session:
             result = await session.execute(select(User).where(User.id == user_id))
             return result.scalar_one_or_none()
 
     async def get_user_by_username(self, username: str) -> User | None:
         """Tìm user theo username"""
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(select(User).where(User.username == username))
             return result.scalar_one_or_none()
 
     async def get_user_by_email(self, email: str) -> User | None:
         """Tìm user theo email"""
-        async with AsyncSessionLocal() as session:
+        async with get_session(read_only=True) as session:
             result = await session.execute(select(User).where(User.email == email))
             return result.scalar_one_or_none()
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, StringConstraints
 from typing_extensions import Annotated
 from datetime import datetime
+from decimal import Decimal
 
 class ProductBase(BaseModel):
     name: Annotated[
@@ -60,3 +61,41 @@ class ProductRead(ProductBase):
             }
         }
     }
+
+
+class ProductDto(BaseModel):
+    """Dữ liệu sản phẩm trả về cho client (cùng dạng với ProductService.to_dto), giá được mã hóa thành chuỗi."""
+    id: int
+    name: str
+    location_address: str
+    category_id: int | None = None
+    description: str | None = None
+    price: Decimal | None = None
+    stock: int = 0
+    attribute: dict[str, list[str]] = {}
+    discount_percentage: int | None = None
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "id": 1,
+                "name": "Laptop Dell XPS 15",
+                "location_address": "Kho hàng Hà Nội",
+                "category_id": 2,
+                "description": "Laptop cao cấp dành cho lập trình viên và designer.",
+                "price": "35990000.00",
+                "stock": 12,
+                "attribute": {"RAM": ["16GB", "32GB"]},
+                "discount_percentage": 10
+            }
+        }
+    }
+
+
+class ProductOptionDto(BaseModel):
+    id: int
+    product_id: int
+    price: Decimal | None = None
+    stock: int
+
+    model_config = {"from_attributes": True}
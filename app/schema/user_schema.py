@@ -124,3 +124,16 @@ class UserUpdate(UserBase):
             }
         }
     }
+
+
+class UserSnapshot(BaseModel):
+    """Thông tin bất biến của user đang đăng nhập, được cache cho bước xác thực."""
+    id: int
+    username: str
+    email: str | None = None
+    is_active: bool
+
+    model_config = {
+        "from_attributes": True,
+        "frozen": True,
+    }
@@ -1,15 +1,27 @@
 import os
+import time
+import hashlib
+from calendar import timegm
 from fastapi import HTTPException
 from datetime import datetime, timedelta #, timezone
 from jose import jwt, JWTError
-from app.model.user import User
+from app.schema.user_schema import UserSnapshot
 from .user_service import UserService
 from .blacklist_token_service import BlacklistTokenService
 from .refresh_token_service import RefreshTokenService
-from app.core.config import SECRET_KEY, ALGORITHM, JWT_ISSUER, JWT_AUDIENCE, ACCESS_TOKEN_EXPIRE, REFRESH_TOKEN_EXPIRE
+from app.core.config import SECRET_KEY, ALGORITHM, JWT_ISSUER, JWT_AUDIENCE, ACCESS_TOKEN_EXPIRE, REFRESH_TOKEN_EXPIRE, TOKEN_CACHE_SIZE
+from app.core.cache import TTLCache
+from app.core.database import commit
 from app.schema.auth_schema import LoginRequest
 
 
+# Payload của các token đã xác thực chữ ký, key là SHA-256 của chuỗi token, sống đến khi token hết hạn
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE)
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
 
 class AuthenticationService:
     def __init__(self):
@@ -40,8 +52,8 @@ class AuthenticationService:
         payload = {
             "iss": JWT_ISSUER,
             "aud": JWT_AUDIENCE,
-            "iat": now,
-            "exp": exp,
+            "iat": timegm(now.utctimetuple()),
+            "exp": timegm(exp.utctimetuple()),
             "jti": jti,
             "uid": user.id,
             "username": user.username,
@@ -55,6 +67,8 @@ class AuthenticationService:
             payload["reuseCount"] = reuse_count
 
         token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+        # Token vừa ký chắc chắn hợp lệ: đưa payload vào cache để lần xác thực sau không phải giải mã lại
+        token_cache.set(_token_key(token), payload, ttl=ttl)
 
         if token_type == "refresh":
             await self.refresh_token_service.create_token(jti, exp)
@@ -65,7 +79,13 @@ class AuthenticationService:
         """
         Xác thực JWT token và trả về payload nếu hợp lệ.
         Nếu không hợp lệ hoặc hết hạn, ném ngoại lệ.
+        Payload đã xác thực được cache đến thời điểm exp của token.
         """
+        key = _token_key(token)
+        payload = token_cache.get(key)
+        if payload is not None:
+            return payload
+
         try:
             payload = jwt.decode(
                 token,
@@ -83,9 +103,10 @@ class AuthenticationService:
         except JWTError:
             raise HTTPException(status_code=401, detail="Invalid token")
 
+        token_cache.set(key, payload, ttl=exp_timestamp - time.time())
         return payload
 
-    async def get_current_user(self, token: str) -> User:
+    async def get_current_user(self, token: str) -> tuple[UserSnapshot, dict]:
         payload = await self.validate_token(token)
         if "jti" in payload:
             if await self.blacklist_token_service.is_token_blacklisted(payload["jti"]):
@@ -94,7 +115,7 @@ class AuthenticationService:
             raise HTTPException(status_code=401, detail="Invalid token")
         if "uid" in payload:
             user_id = payload["uid"]
-            return (await self.user_service.get_user_by_id(user_id), payload)
+            return (await self.user_service.get_user_snapshot(user_id), payload)
         else:
             raise HTTPException(status_code=401, detail="Invalid token")
 
@@ -117,7 +138,7 @@ class AuthenticationService:
             raise HTTPException(status_code=401, detail="Refresh token has expired.")
 
         # Lấy thông tin người dùng
-        user = await self.user_service.get_user_by_id(user_id)
+        user = await self.user_service.get_user_snapshot(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found.")
 
@@ -175,9 +196,11 @@ class AuthenticationService:
             raise HTTPException(status_code=401, detail="Invalid or overused Refresh Token.")
         if stored_token.expires_at < datetime.utcnow():
             await self.refresh_token_service.delete_token(jti)
+            # Giữ lại việc xóa token dù request trả về lỗi
+            await commit()
             raise HTTPException(status_code=401, detail="Refresh Token has expired.")
 
-        user = await self.user_service.get_user_by_id(user_id)
+        user = await self.user_service.get_user_snapshot(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found.")
 
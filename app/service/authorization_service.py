@@ -1,9 +1,49 @@
-from typing import Optional, List
+import asyncio
+import logging
+from typing import Optional, List, Iterable
 from app.model.user import User
+from app.repository.user_permission_repository import UserPermissionRepository
+from app.repository.group_permission_repository import GroupPermissionRepository
+from app.repository.authorization_repository import AuthorizationRepository
+from app.core.cache import TTLCache
+from app.core.config import PERMISSION_CACHE_SIZE, PERMISSION_CACHE_TTL
+from app.core.invalidation import subscribe
+from app.core.database import create_background_task
 from .user_permission_service import UserPermissionService
 from .group_member_service import GroupMemberService
 from .group_permission_service import GroupPermissionService
 from .permission_service import PermissionService
+from .permission_table import PermissionTable
+from app.core.permission_scope import PermissionScope
+
+
+logger = logging.getLogger(__name__)
+
+# Bảng quyết định quyền đã biên dịch, key là user id
+permission_table_cache = TTLCache(maxsize=PERMISSION_CACHE_SIZE, ttl=PERMISSION_CACHE_TTL)
+
+# Các user đang được dựng bảng quyết định ở nền (giữ tham chiếu tới task)
+_warming_tasks: dict[int, asyncio.Task] = {}
+
+
+def _on_user_grants_changed(user_id: int | None, data: dict):
+    if user_id is None:
+        permission_table_cache.clear()
+    else:
+        permission_table_cache.pop(user_id)
+
+
+def _on_shared_grants_changed(key, data: dict):
+    # Thay đổi của group hoặc danh mục quyền ảnh hưởng tới nhiều user: xóa toàn bộ
+    permission_table_cache.clear()
+
+
+subscribe("user_permission", _on_user_grants_changed)
+subscribe("group_member", _on_user_grants_changed)
+subscribe("group_permission", _on_shared_grants_changed)
+subscribe("group", _on_shared_grants_changed)
+subscribe("permission", _on_shared_grants_changed)
+
 
 class AuthorizationService:
     def __init__(self):
@@ -11,6 +51,45 @@ class AuthorizationService:
         self.group_member_service = GroupMemberService()
         self.group_permission_service = GroupPermissionService()
         self.permission_service = PermissionService()
+        self.user_permission_repository = UserPermissionRepository()
+        self.group_permission_repository = GroupPermissionRepository()
+        self.authorization_repository = AuthorizationRepository()
+
+    async def get_permission_table(self, user: User) -> PermissionTable:
+        """
+        Lấy bảng quyết định quyền đã biên dịch của user (từ cache nếu có).
+        Bảng được dựng một lần từ quyền của user, quyền của các group chứa user và quyền mặc định.
+        """
+        table = permission_table_cache.get(user.id)
+        if table is None:
+            generation = permission_table_cache.generation
+            defaults = await self.permission_service.get_permission_defaults()
+            user_grants = await self.user_permission_repository.find_enabled_grants_by_user(user.id)
+            group_grants = await self.group_permission_repository.find_enabled_grants_by_user(user.id)
+            table = PermissionTable.compile(
+                defaults,
+                user_grants,
+                group_grants,
+            )
+            # Không lưu nếu quyền vừa bị thay đổi trong lúc đang dựng bảng
+            if permission_table_cache.generation == generation:
+                permission_table_cache.set(user.id, table)
+        return table
+
+    def _warm_permission_table(self, user: User) -> None:
+        """Dựng bảng quyết định của user ở nền (mỗi user tối đa một task)."""
+        if user.id in _warming_tasks:
+            return
+
+        async def warm():
+            try:
+                await self.get_permission_table(user)
+            except Exception:
+                logger.exception("Unable to build permission table for user %s", user.id)
+            finally:
+                _warming_tasks.pop(user.id, None)
+
+        _warming_tasks[user.id] = create_background_task(warm())
 
     async def check_permission(
         self,
@@ -28,27 +107,61 @@ class AuthorizationService:
         :param is_user_owned: Tài nguyên truy cập, chỉnh sửa thuộc về người đang đăng nhập, và user_permission_service không có phản hồi rõ ràng rằng người dùng có quyền hay không.
         :return: True nếu người dùng hoặc nhóm có quyền, False nếu không
         """
-        # 1. Kiểm tra quyền của người dùng
-        user_permission = await self.user_permission_service.has_permission(user.id, permission_name, target_id)
-        if user_permission < 0:
-            return False
-        elif user_permission > 0:
-            return True
+        table = permission_table_cache.get(user.id)
+        if table is not None:
+            permission = table.get(permission_name)
+            if permission is not None:
+                return permission.check(target_id, is_user_owned)
+        else:
+            # Cache nguội: quyết định bằng một câu SQL, bảng quyết định được dựng ở nền cho các lần sau
+            self._warm_permission_table(user)
+            decision = await self.authorization_repository.resolve_permission(
+                user.id, permission_name, target_id, is_user_owned
+            )
+            if decision is not None:
+                return decision
 
         if is_user_owned:
             return True
+        # Quyền không tồn tại: PermissionService sẽ raise HTTPException 404
+        await self.permission_service.get_permission_by_name(permission_name)
+        return False
 
-        # 2. Lấy danh sách các nhóm mà người dùng thuộc về
-        groups = await self.group_member_service.find_groups_by_user(user)
+    async def check_permissions_bulk(
+        self,
+        user: User,
+        checks: Iterable[tuple[str, Optional[int]]]
+    ) -> List[bool]:
+        """
+        Kiểm tra nhiều cặp (permission_name, target_id) cùng lúc, chỉ dùng một lần nạp bảng quyết định.
 
-        # 3. Kiểm tra quyền của từng nhóm
-        for group in groups:
-            if await self.group_permission_service.has_permission(group.id, permission_name, target_id)>0:
-                return True
+        :param user: Đối tượng người dùng cần kiểm tra
+        :param checks: Danh sách cặp (tên quyền, target_id), target_id có thể là None
+        :return: Danh sách kết quả theo đúng thứ tự của checks
+        """
+        table = await self.get_permission_table(user)
+        decisions = []
+        for permission_name, target_id in checks:
+            permission = table.get(permission_name)
+            if permission is None:
+                # Quyền không tồn tại: PermissionService sẽ raise HTTPException 404
+                await self.permission_service.get_permission_by_name(permission_name)
+                decisions.append(False)
+            else:
+                decisions.append(permission.check(target_id))
+        return decisions
 
-        # 4. Nếu không tìm thấy quyền hợp lệ, kiểm tra mặc định từ permission
-        permission = await self.permission_service.get_permission_by_name(permission_name)
-        if permission:
-            return permission.default
-        else:
-            return False
+    async def get_permission_scope(self, user: User, permission_name: str) -> PermissionScope:
+        """
+        Lấy phạm vi target mà user được phép với một quyền, dùng để lọc danh sách trong một bước.
+
+        :param user: Đối tượng người dùng cần kiểm tra
+        :param permission_name: Tên quyền cần kiểm tra
+        :return: PermissionScope (được phép trên mọi target trừ một số target, hoặc chỉ trên một số target)
+        """
+        table = await self.get_permission_table(user)
+        permission = table.get(permission_name)
+        if permission is None:
+            await self.permission_service.get_permission_by_name(permission_name)
+            return PermissionScope(False)
+        return permission.scope()
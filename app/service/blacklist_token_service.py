@@ -1,20 +1,52 @@
 from app.repository.blacklist_token_repository import BlacklistTokenRepository
 from app.model.blacklist_token import BlacklistToken
+from app.core.bloom_filter import ExpiringBloomFilter
+from app.core.config import BLACKLIST_FILTER_CAPACITY, BLACKLIST_FILTER_ERROR_RATE, BLACKLIST_FILTER_WINDOW
+from app.core.invalidation import subscribe, publish
+from calendar import timegm
 from datetime import datetime
 
 
+# Bloom filter các jti đang bị blacklist, dùng chung trong worker.
+# Chỉ khi filter báo "có thể có" mới cần truy vấn bảng blacklist_tokens.
+blacklist_filter = ExpiringBloomFilter(
+    capacity=BLACKLIST_FILTER_CAPACITY,
+    error_rate=BLACKLIST_FILTER_ERROR_RATE,
+    window=BLACKLIST_FILTER_WINDOW,
+)
+
+
+def _on_blacklist_changed(token_id: str | None, data: dict):
+    if token_id is None:
+        # Trả về coroutine: dispatch sẽ chạy việc nạp lại filter ở nền
+        return BlacklistTokenService().load_filter()
+    blacklist_filter.add(token_id, data["expires_at"])
+
+
+subscribe("blacklist_token", _on_blacklist_changed)
+
+
 class BlacklistTokenService:
 
     def __init__(self):
         self.repository = BlacklistTokenRepository()
 
+    async def load_filter(self):
+        """ Dựng lại bloom filter từ các token blacklist còn hiệu lực (gọi khi khởi động app) """
+        tokens = await self.repository.find_active_tokens()
+        blacklist_filter.rebuild((token.id, timegm(token.expires_at.utctimetuple())) for token in tokens)
+
     async def add_token(self, token_id: str, expires_at: datetime):
-        """ Thêm token vào danh sách blacklist """
+        """ Thêm token vào danh sách blacklist và báo cho các worker khác cập nhật bloom filter """
         token = BlacklistToken(id=token_id, expires_at=expires_at)
-        return await self.repository.add_token(token)
+        token = await self.repository.add_token(token)
+        await publish("blacklist_token", token_id, expires_at=timegm(expires_at.utctimetuple()))
+        return token
 
     async def is_token_blacklisted(self, token_id: str) -> bool:
-        """ Kiểm tra token có trong blacklist không """
+        """ Kiểm tra token có trong blacklist không (chỉ truy vấn DB khi bloom filter báo có thể có) """
+        if blacklist_filter.loaded and token_id not in blacklist_filter:
+            return False
         return await self.repository.is_token_blacklisted(token_id)
 
     async def delete_token(self, token_id: str):
@@ -4,6 +4,7 @@ from app.model.user import User
 from app.model.group import Group
 from app.model.group_member import GroupMember
 from app.core.exceptions import DuplicateDataError
+from app.core.invalidation import publish
 from app.schema.group_member_schema import GroupMemberBase, GroupMemberCreate
 from .user_service import UserService
 from .group_service import GroupService
@@ -27,9 +28,10 @@ class GroupMemberService:
         group_member = GroupMember(user_id=user.id, group_id=group.id)
         try:
             group_member = await self.group_member_repository.add(group_member)
-            return group_member
         except DuplicateDataError as e:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        await publish("group_member", user.id, group_id=group.id)
+        return group_member
 
     async def remove_user_from_group(self, data: GroupMemberBase) -> None:
         """
@@ -44,6 +46,7 @@ class GroupMemberService:
         success = await self.group_member_repository.delete(group_member)
         if not success:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to remove user from group")
+        await publish("group_member", user.id, group_id=group.id)
 
     async def find_groups_by_user(self, user: User) -> list[Group]:
         """
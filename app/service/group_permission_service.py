@@ -3,6 +3,8 @@ from app.repository.group_permission_repository import GroupPermissionRepository
 from app.model.group_permission import GroupPermission
 from app.model.group import Group
 from app.model.permission import Permission
+from app.core.invalidation import publish
+from app.core.database import commit
 from .group_service import GroupService
 from .permission_service import PermissionService
 from app.schema.group_permission_schema import (
@@ -48,6 +50,7 @@ class GroupPermissionService:
             })
 
         await self.repository.bulk_insert(group_permissions_to_add)
+        await publish("group_permission", group.id)
         return assigned_permissions
 
     async def set_permission(self, group: Group, permissions: list[Permission]) -> list:
@@ -71,6 +74,7 @@ class GroupPermissionService:
             group_permissions.append(group_permission)
 
         await self.repository.bulk_insert(group_permissions_to_add)
+        await publish("group_permission", group.id)
         return group_permissions
 
     async def find_permissions_by_group(self, group: Group) -> list[GroupPermission]:
@@ -124,6 +128,7 @@ class GroupPermissionService:
             updated_permissions.append(group_permission)
 
         await self.repository.bulk_update(updated_permissions)
+        await publish("group_permission", group.id)
         return [{"permission_id": gp.permission_id, "status": "updated"} for gp in updated_permissions]
 
     async def delete_permissions(self, data: GroupPermissionsDelete) -> None:
@@ -146,7 +151,10 @@ class GroupPermissionService:
         group_permissions_to_delete = [gp for gp in group_permissions if gp.permission_id in requested_permission_ids]
 
         failed_deletes = await self.repository.bulk_delete(group_permissions_to_delete)
+        await publish("group_permission", group.id)
         if failed_deletes:
+            # Giữ lại các bản ghi đã xóa thành công (và NOTIFY) dù request trả về lỗi
+            await commit()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Không thể thu hồi quyền với id: {', '.join(str(gp.id) for gp in failed_deletes)}"
@@ -3,14 +3,23 @@ from app.repository.group_repository import GroupRepository
 from app.schema.group_schema import GroupCreate, GroupUpdate
 from app.model.group import Group
 from app.core.exceptions import DuplicateDataError
+from app.core.invalidation import publish
+from app.core.pagination import decode_cursor, check_page_depth, split_page
 
 class GroupService:
     def __init__(self):
         self.repository = GroupRepository()
 
-    async def get_paginated_groups(self, page: int, limit: int):
-        """Lấy danh sách nhóm theo phân trang"""
-        return await self.repository.get_groups_paginated(page, limit)
+    async def get_paginated_groups(self, page: int, limit: int, cursor: str | None = None):
+        """
+        Lấy danh sách nhóm theo phân trang: theo cursor nếu có, ngược lại theo page (giới hạn độ sâu).
+        Trả về (danh sách nhóm, cursor của trang sau hoặc None).
+        """
+        after = decode_cursor(cursor, int) if cursor else None
+        if after is None:
+            check_page_depth(page)
+        groups = await self.repository.get_groups_paginated(page, limit, after)
+        return split_page(groups, limit, lambda group: (group.id,))
 
     async def get_group_by_id(self, group_id: int):
         """Lấy thông tin nhóm theo ID"""
@@ -41,4 +50,5 @@ class GroupService:
         success = await self.repository.delete_group(group)
         if not success:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to delete group")
+        await publish("group", group.id)
         return {"message": "Group deleted"}
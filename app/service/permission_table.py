@@ -0,0 +1,123 @@
+from app.core.permission_scope import PermissionScope
+
+
+ALLOW = 1
+DENY = -1
+
+
+class EffectivePermission:
+    """
+    Quyết định đã biên dịch của một user cho một quyền.
+    Thứ tự ưu tiên giống AuthorizationService.check_permission:
+      user deny > user allow (bản ghi theo target được ưu tiên hơn bản ghi toàn cục)
+      > tài nguyên thuộc về user > group allow > quyền mặc định.
+    """
+    __slots__ = (
+        "user_global",
+        "user_targets",
+        "group_global_allow",
+        "group_allow_targets",
+        "group_global_denied",
+        "default",
+    )
+
+    def __init__(self, default: bool = False):
+        self.user_global = 0                            # ALLOW / DENY / 0 của bản ghi target_id = None
+        self.user_targets: dict[int, int] = {}          # target_id -> ALLOW / DENY
+        self.group_global_allow = 0                     # số nhóm cho phép trên mọi target
+        self.group_allow_targets: set[int] = set()      # target được ít nhất một nhóm cho phép riêng
+        self.group_global_denied: dict[int, int] = {}   # target -> số nhóm (trong group_global_allow) từ chối riêng target đó
+        self.default = default
+
+    def check(self, target_id: int | None = None, is_user_owned: bool = False) -> bool:
+        decision = self.user_targets.get(target_id, 0) if target_id is not None else 0
+        if not decision:
+            decision = self.user_global
+        if decision:
+            return decision > 0
+        if is_user_owned:
+            return True
+        if target_id is not None and target_id in self.group_allow_targets:
+            return True
+        if self.group_global_allow - self.group_global_denied.get(target_id, 0) > 0:
+            return True
+        return self.default
+
+    def scope(self) -> "PermissionScope":
+        """
+        Tập target mà user được phép với quyền này.
+        Các target không có bản ghi riêng đều dùng chung một quyết định, nên chỉ cần xét các target có bản ghi riêng.
+        """
+        if self.user_global:
+            base = self.user_global > 0
+        else:
+            base = self.group_global_allow > 0 or self.default
+        explicit = set(self.user_targets) | self.group_allow_targets | set(self.group_global_denied)
+        return PermissionScope(
+            base,
+            frozenset(target_id for target_id in explicit if self.check(target_id) != base),
+        )
+
+
+class PermissionTable:
+    """Bảng quyết định quyền của một user: tên quyền -> EffectivePermission."""
+
+    def __init__(self, defaults: dict[str, bool]):
+        self.defaults = defaults
+        self.permissions: dict[str, EffectivePermission] = {}
+
+    def _entry(self, name: str) -> EffectivePermission:
+        entry = self.permissions.get(name)
+        if entry is None:
+            entry = self.permissions[name] = EffectivePermission(self.defaults.get(name, False))
+        return entry
+
+    def get(self, name: str) -> EffectivePermission | None:
+        """Trả về quyết định của quyền, None nếu quyền không tồn tại."""
+        entry = self.permissions.get(name)
+        if entry is None and name in self.defaults:
+            entry = self._entry(name)
+        return entry
+
+    @classmethod
+    def compile(cls, defaults: dict[str, bool], user_grants, group_grants) -> "PermissionTable":
+        """
+        Biên dịch bảng quyết định trong một lượt duyệt.
+        - defaults: tên quyền -> quyền mặc định.
+        - user_grants: các bản ghi (name, target_id, is_denied) đang bật của user.
+        - group_grants: các bản ghi (group_id, name, target_id, is_denied) đang bật của các nhóm chứa user.
+        Với nhiều bản ghi trùng (name, target_id), bản ghi đầu tiên được dùng.
+        """
+        table = cls(defaults)
+
+        for name, target_id, is_denied in user_grants:
+            entry = table._entry(name)
+            decision = DENY if is_denied else ALLOW
+            if target_id is None:
+                if not entry.user_global:
+                    entry.user_global = decision
+            else:
+                entry.user_targets.setdefault(target_id, decision)
+
+        # Gom quyết định theo từng nhóm trước, vì target riêng của một nhóm chỉ ghi đè bản ghi toàn cục của chính nhóm đó
+        per_group: dict[tuple[int, str], list] = {}
+        for group_id, name, target_id, is_denied in group_grants:
+            group_global, group_targets = per_group.setdefault((group_id, name), [0, {}])
+            decision = DENY if is_denied else ALLOW
+            if target_id is None:
+                if not group_global:
+                    per_group[(group_id, name)][0] = decision
+            else:
+                group_targets.setdefault(target_id, decision)
+
+        for (_, name), (group_global, group_targets) in per_group.items():
+            entry = table._entry(name)
+            if group_global == ALLOW:
+                entry.group_global_allow += 1
+            for target_id, decision in group_targets.items():
+                if decision == ALLOW:
+                    entry.group_allow_targets.add(target_id)
+                elif group_global == ALLOW:
+                    entry.group_global_denied[target_id] = entry.group_global_denied.get(target_id, 0) + 1
+
+        return table
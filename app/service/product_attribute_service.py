@@ -1,3 +1,21 @@
+from app.repository.product_attribute_repository import ProductAttributeRepository
+from app.model.product_attribute import ProductAttribute
+from app.model.product import Product
+
 
 class ProductAttributeService:
-    pass
\ No newline at end of file
+
+    def __init__(self):
+        self.repository = ProductAttributeRepository()
+
+    async def find_by_product(self, product: Product) -> list[ProductAttribute]:
+        """Lấy các thuộc tính của sản phẩm"""
+        return await self.repository.find_by_product_id(product.id)
+
+    async def find_by_name_and_product(self, name: str, product: Product) -> ProductAttribute | None:
+        """Tìm thuộc tính theo tên trong sản phẩm"""
+        return await self.repository.find_by_name_and_product_id(name, product.id)
+
+    async def create_product_attribute(self, product: Product, name: str) -> ProductAttribute:
+        """Tạo thuộc tính mới cho sản phẩm"""
+        return await self.repository.create(ProductAttribute(product_id=product.id, name=name))
@@ -1,3 +1,34 @@
+from app.repository.product_attribute_value_repository import ProductAttributeValueRepository
+from app.model.product_attribute_value import ProductAttributeValue
+from app.model.product_attribute import ProductAttribute
+
 
 class ProductAttributeValueService:
-    pass
\ No newline at end of file
+
+    def __init__(self):
+        self.repository = ProductAttributeValueRepository()
+
+    async def find_by_attribute(self, attribute: ProductAttribute) -> list[ProductAttributeValue]:
+        """Lấy các giá trị của thuộc tính"""
+        return await self.repository.find_by_attribute_ids([attribute.id])
+
+    async def find_by_value_and_attribute(self, value: str, attribute: ProductAttribute) -> ProductAttributeValue | None:
+        """Tìm giá trị theo nội dung trong thuộc tính"""
+        return await self.repository.find_by_value_and_attribute_id(value, attribute.id)
+
+    async def create_product_attribute_value(self, attribute: ProductAttribute, value: str) -> ProductAttributeValue:
+        """Thêm giá trị mới cho thuộc tính"""
+        return await self.repository.save(ProductAttributeValue(product_attribute_id=attribute.id, value=value))
+
+    async def update_product_attribute_value(
+        self,
+        attribute_value: ProductAttributeValue,
+        value: str
+    ) -> ProductAttributeValue:
+        """Cập nhật nội dung của giá trị thuộc tính"""
+        attribute_value.value = value
+        return await self.repository.save(attribute_value)
+
+    async def delete_product_attribute_value(self, attribute_value: ProductAttributeValue) -> None:
+        """Xóa giá trị thuộc tính"""
+        await self.repository.delete(attribute_value)
@@ -1,4 +1,23 @@
+from app.repository.product_option_repository import ProductOptionRepository
+from app.model.product_option import ProductOption
+from app.model.product import Product
+
 
 class ProductOptionService:
-    pass
 
+    def __init__(self):
+        self.repository = ProductOptionRepository()
+
+    async def find_by_product(self, product: Product) -> list[ProductOption]:
+        """Lấy các tùy chọn của sản phẩm"""
+        return await self.repository.find_by_product_id(product.id)
+
+    async def create_product_option(self, product: Product, price, stock: int) -> ProductOption:
+        """Tạo tùy chọn mới (giá, tồn kho) cho sản phẩm"""
+        return await self.repository.save(ProductOption(product_id=product.id, price=price, stock=stock or 0))
+
+    async def update_product_option(self, option: ProductOption, price, stock: int) -> ProductOption:
+        """Cập nhật giá và tồn kho của tùy chọn"""
+        option.price = price
+        option.stock = stock
+        return await self.repository.save(option)
@@ -1,3 +1,32 @@
+from app.repository.product_option_value_repository import ProductOptionValueRepository
+from app.model.product_option_value import ProductOptionValue
+from app.model.product_option import ProductOption
+from app.model.product_attribute_value import ProductAttributeValue
+
 
 class ProductOptionValueService:
-    pass
\ No newline at end of file
+
+    def __init__(self):
+        self.repository = ProductOptionValueRepository()
+
+    async def find_by_option(self, option: ProductOption) -> list[ProductOptionValue]:
+        """Lấy các giá trị thuộc tính của tùy chọn"""
+        return await self.repository.find_by_option_id(option.id)
+
+    async def find_by_value_and_option(
+        self,
+        attribute_value: ProductAttributeValue,
+        option: ProductOption
+    ) -> ProductOptionValue | None:
+        """Tìm liên kết giữa tùy chọn và giá trị thuộc tính"""
+        return await self.repository.find_by_attribute_value_and_option_id(attribute_value.id, option.id)
+
+    async def create_product_option_value(
+        self,
+        option: ProductOption,
+        attribute_value: ProductAttributeValue
+    ) -> ProductOptionValue:
+        """Liên kết tùy chọn với một giá trị thuộc tính"""
+        return await self.repository.create(
+            ProductOptionValue(product_option_id=option.id, product_attribute_value_id=attribute_value.id)
+        )
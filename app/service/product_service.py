@@ -1,21 +1,46 @@
 import json
+from decimal import Decimal, InvalidOperation
 from fastapi import HTTPException, status
 from app.repository.product_repository import ProductRepository
 from app.repository.category_repository import CategoryRepository
+from app.repository.product_attribute_repository import ProductAttributeRepository
+from app.repository.product_attribute_value_repository import ProductAttributeValueRepository
+from app.repository.product_document_repository import ProductDocumentRepository
 from app.model.product import Product
 from app.model.product_option import ProductOption
+from app.schema.product_schema import ProductDto
 from .product_attribute_service import ProductAttributeService
 from .product_attribute_value_service import ProductAttributeValueService
 from .product_option_service import ProductOptionService
 from .product_option_value_service import ProductOptionValueService
+from app.core.pagination import decode_cursor, check_page_depth, split_page
+from app.core.cache import TTLCache
+from app.core.invalidation import publish, subscribe
+from app.core.config import SUGGEST_CACHE_SIZE, SUGGEST_CACHE_TTL, PRODUCT_SEARCH_MAX_CANDIDATES
+from app.core.permission_scope import PermissionScope
 # from app.exception import AppException
 
 
+# Cache gợi ý tên sản phẩm theo (chuỗi đã chuẩn hóa, limit)
+suggest_cache = TTLCache(maxsize=SUGGEST_CACHE_SIZE, ttl=SUGGEST_CACHE_TTL)
+
+
+def _on_product_changed(product_id: int | None, data: dict):
+    # Một sản phẩm có thể nằm trong kết quả của rất nhiều chuỗi gợi ý: xóa toàn bộ
+    suggest_cache.clear()
+
+
+subscribe("product", _on_product_changed)
+
+
 
 class ProductService:
     def __init__(self):
         self.product_repository = ProductRepository()
         self.category_repository = CategoryRepository()
+        self.product_attribute_repository = ProductAttributeRepository()
+        self.product_attribute_value_repository = ProductAttributeValueRepository()
+        self.product_document_repository = ProductDocumentRepository()
         self.product_attribute_service = ProductAttributeService()
         self.product_attribute_value_service = ProductAttributeValueService()
         self.product_option_service = ProductOptionService()
@@ -23,51 +48,162 @@ class ProductService:
 
     async def to_dto(self, product: Product) -> dict:
         """Chuyển đối tượng Product thành dict (DTO)"""
-        attributes = await self.get_product_attributes(product)
-        price_and_stock = await self.get_product_price_and_stock(product)
-        return {
-            "id": product.id,
-            "name": product.name,
-            "location_address": product.location_address,
-            "category_id": product.category.id if product.category else None,
-            "description": product.description,
-            "price": price_and_stock["prices"],
-            "stock": price_and_stock["stock"],
-            "attribute": attributes,
-            "discount_percentage": product.discount_percentage,
-        }
-
-    async def search_products_by_keywords(self, keywords: str) -> list:
-        """Tìm sản phẩm theo từ khóa và trả về DTO của sản phẩm chưa bị xóa"""
-        products = await self.product_repository.search_products_by_keywords(keywords)
-        result = []
-        for product in products:
-            if not product.is_delete:
-                result.append(await self.to_dto(product))
-        return result
+        return (await self.to_dtos([product]))[0]
+
+    async def to_dtos(self, products: list[Product]) -> list[dict]:
+        """
+        Chuyển danh sách Product thành DTO với số câu truy vấn cố định, không phụ thuộc số sản phẩm:
+        thuộc tính và giá trị thuộc tính của cả trang được lấy bằng các câu IN (...) rồi ghép lại trong bộ nhớ.
+        Giá và tồn kho đọc từ cột tổng hợp của products, không truy vấn bảng tùy chọn.
+        """
+        if not products:
+            return []
+        product_ids = [product.id for product in products]
+
+        attributes = await self.product_attribute_repository.find_by_product_ids(product_ids)
+        values = await self.product_attribute_value_repository.find_by_attribute_ids([attr.id for attr in attributes])
+        values_by_attribute: dict[int, list[str]] = {}
+        for value in values:
+            values_by_attribute.setdefault(value.product_attribute_id, []).append(value.value)
+        attributes_by_product: dict[int, dict] = {product_id: {} for product_id in product_ids}
+        for attr in attributes:
+            attributes_by_product[attr.product_id][attr.name] = values_by_attribute.get(attr.id, [])
+
+        return [
+            {
+                "id": product.id,
+                "name": product.name,
+                "location_address": product.location_address,
+                "category_id": product.category_id,
+                "description": product.description,
+                "price": product.min_price,
+                "stock": product.total_stock,
+                "attribute": attributes_by_product[product.id],
+                "discount_percentage": product.discount_percentage,
+            }
+            for product in products
+        ]
+
+    async def search_products_by_keywords(
+        self,
+        keywords: str,
+        page: int = 1,
+        limit: int = 20
+    ) -> tuple[list, int | None, bool]:
+        """
+        Tìm sản phẩm chưa bị xóa theo từ khóa, xếp theo độ liên quan và phân trang, trả về DTO.
+        Trả về (danh sách DTO, tổng số sản phẩm khớp hoặc None, True nếu chỉ PRODUCT_SEARCH_MAX_CANDIDATES kết quả đầu
+        được phân trang).
+        """
+        check_page_depth(page)
+        products, total = await self.product_repository.search_products_by_keywords(keywords, page, limit)
+        truncated = total is not None and total > PRODUCT_SEARCH_MAX_CANDIDATES
+        return await self.to_dtos(products), total, truncated
+
+    async def suggest_product_names(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Gợi ý tên sản phẩm cho chuỗi đang nhập (chịu được gõ sai), kết quả được cache theo chuỗi trong thời gian ngắn"""
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        key = (prefix, limit)
+        suggestions = suggest_cache.get(key)
+        if suggestions is None:
+            rows = await self.product_repository.suggest_names(prefix, limit)
+            suggestions = [{"id": product_id, "name": name} for product_id, name in rows]
+            suggest_cache.set(key, suggestions)
+        return suggestions
 
     async def get_all_product_dtos(self) -> list:
         """Lấy tất cả sản phẩm (DTO) chưa bị xóa"""
         products = await self.product_repository.find_all()
-        result = []
-        for product in products:
-            if not product.is_delete:
-                result.append(await self.to_dto(product))
-        return result
-
-    async def get_paginated_product_dtos(self, page: int, limit: int) -> list:
-        """Lấy sản phẩm theo phân trang và trả về DTO"""
-        products = await self.product_repository.find_all_paginated(page, limit)
-        result = []
-        for product in products:
-            result.append(await self.to_dto(product))
-        return result
+        return await self.to_dtos([product for product in products if not product.is_delete])
+
+    async def get_product_dtos_by_category_id(self, category_id: int) -> list:
+        """Lấy các sản phẩm (DTO) chưa bị xóa thuộc một danh mục"""
+        products = await self.product_repository.find_by_category_id(category_id)
+        return await self.to_dtos([product for product in products if not product.is_delete])
+
+    async def get_values_by_option_id(self, option_id: int) -> list[str]:
+        """Lấy các giá trị thuộc tính tạo nên một tùy chọn"""
+        option_values = await self.product_option_value_service.repository.find_by_option_id(option_id)
+        return [option_value.product_attribute_value.value for option_value in option_values]
+
+    async def get_paginated_product_dtos(
+        self,
+        page: int,
+        limit: int,
+        scope: PermissionScope | None = None,
+        cursor: str | None = None,
+        sort: str = "id"
+    ) -> tuple[list, str | None]:
+        """
+        Lấy sản phẩm theo phân trang (lọc theo phạm vi quyền nếu có), sắp xếp theo id hoặc giá, và trả về DTO.
+        Phân trang theo cursor nếu có, ngược lại theo page (giới hạn độ sâu).
+        Trả về (danh sách DTO, cursor của trang sau hoặc None).
+        """
+        if sort == "price":
+            after = decode_cursor(cursor, (str, type(None)), int) if cursor else None
+            if after is not None:
+                after = (self._decode_price(after[0]), after[1])
+            # Decimal không mã hóa được bằng JSON: giá được đưa vào cursor dưới dạng chuỗi
+            key = lambda product: (str(product.min_price) if product.min_price is not None else None, product.id)
+        else:
+            after = decode_cursor(cursor, int) if cursor else None
+            key = lambda product: (product.id,)
+        if after is None:
+            check_page_depth(page)
+        products = await self.product_repository.find_all_paginated(page, limit, scope, after, sort)
+        products, next_cursor = split_page(products, limit, key)
+        return await self.to_dtos(products), next_cursor
+
+    @staticmethod
+    def _decode_price(value) -> Decimal | None:
+        if value is None:
+            return None
+        try:
+            price = Decimal(value)
+        except (InvalidOperation, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if not price.is_finite():
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return price
 
     async def get_product_dto_by_id(self, product_id: int) -> dict:
         """Lấy DTO của sản phẩm theo ID"""
         product = await self.get_product_by_id(product_id)
         return await self.to_dto(product)
 
+    async def get_product_document(self, product_id: int) -> str:
+        """
+        Lấy document JSON (đúng dạng to_dto) của sản phẩm: một câu đọc một dòng, trả về nguyên chuỗi JSON.
+        Document chỉ được tạo/xóa khi ghi; nếu thiếu (không nên xảy ra sau migration v0003) thì dựng DTO để trả về
+        nhưng không ghi lại, để request đọc không bao giờ ghi (và chạy được trên read replica).
+        """
+        body = await self.product_document_repository.find_body(product_id)
+        if body is not None:
+            return body
+        product = await self.product_repository.find_by_id(product_id)
+        if not product or product.is_delete:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        return json.dumps(self._encode_document(await self.to_dto(product)), ensure_ascii=False)
+
+    @staticmethod
+    def _encode_document(dto: dict) -> dict:
+        """Mã hóa DTO theo ProductDto (giá Decimal thành chuỗi, giống response của API)"""
+        return ProductDto.model_validate(dto).model_dump(mode="json")
+
+    async def render_document(self, product: Product) -> dict:
+        """
+        Tạo lại document của sản phẩm sau khi ghi (cùng transaction với thay đổi), trả về DTO đã lưu.
+        Sản phẩm đã bị xóa thì xóa document để trang chi tiết trả về 404.
+        """
+        document = self._encode_document(await self.to_dto(product))
+        if product.is_delete:
+            await self.product_document_repository.delete(product.id)
+        else:
+            await self.product_document_repository.save(product.id, document)
+        return document
+
     async def get_product_by_id(self, product_id: int) -> Product:
         """Tìm sản phẩm theo ID và kiểm tra xem sản phẩm có bị đánh dấu xóa không"""
         product = await self.product_repository.find_by_id(product_id)
@@ -118,14 +254,17 @@ class ProductService:
         stock = data.get("stock", 0)
         await self.product_option_service.create_product_option(product, price, stock)
 
-        return await self.to_dto(product)
+        await publish("product", product.id)
+        return await self.render_document(product)
 
     async def update_product(self, product_id: int, data: dict) -> dict:
         """Cập nhật thông tin sản phẩm"""
         product = await self.get_product_by_id(product_id)
         option_default = await self.find_option_default(product)
-        
+        renamed = False
+
         if "name" in data and data["name"]:
+            renamed = data["name"] != product.name
             product.name = data["name"]
         if "location_address" in data and data["location_address"]:
             product.location_address = data["location_address"]
@@ -166,31 +305,22 @@ class ProductService:
                     if not existing_value:
                         await self.product_attribute_value_service.create_product_attribute_value(product_attribute, value)
 
-        return await self.to_dto(product)
+        # Chỉ tên sản phẩm ảnh hưởng tới gợi ý
+        if renamed:
+            await publish("product", product.id)
+        return await self.render_document(product)
 
     async def delete_product(self, product_id: int) -> None:
         """Đánh dấu sản phẩm là đã xóa (soft-delete)"""
         product = await self.get_product_by_id(product_id)
         product.is_delete = True
         await self.product_repository.update(product)
+        await publish("product", product.id)
+        await self.render_document(product)
 
     async def get_product_price_and_stock(self, product: Product) -> dict:
-        """Tính toán giá thấp nhất và tổng số tồn kho từ các tùy chọn sản phẩm"""
-        options = await self.product_option_service.find_by_product(product)
-        if len(options) == 1:
-            return {"prices": options[0].price, "stock": options[0].stock}
-        
-        # Lọc các option có option values hợp lệ
-        valid_options = []
-        for option in options:
-            option_values = await self.product_option_value_service.find_by_option(option)
-            if option_values:
-                valid_options.append(option)
-        if valid_options:
-            prices = [opt.price for opt in valid_options]
-            total_stock = sum(opt.stock for opt in valid_options)
-            return {"prices": min(prices), "stock": total_stock}
-        return {"prices": None, "stock": 0}
+        """Giá thấp nhất và tổng số tồn kho của sản phẩm (cột tổng hợp, được cập nhật khi tùy chọn thay đổi)"""
+        return {"prices": product.min_price, "stock": product.total_stock}
 
     async def find_option_default(self, product: Product) -> ProductOption:
         """Tìm tùy chọn mặc định của sản phẩm"""
@@ -268,6 +398,8 @@ class ProductService:
                 if not existing_option_value:
                     await self.product_option_value_service.create_product_option_value(product_option, attribute_value_entity)
 
+        await self.render_document(product)
+
     async def find_product_option_by_json(self, product: Product, json_string: str) -> ProductOption:
         """Tìm tùy chọn sản phẩm dựa trên chuỗi JSON mô tả các thuộc tính"""
         try:
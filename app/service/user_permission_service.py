@@ -3,6 +3,8 @@ from app.repository.user_permission_repository import UserPermissionRepository
 from app.model.user_permission import UserPermission
 from app.model.user import User
 from app.model.permission import Permission
+from app.core.invalidation import publish
+from app.core.database import commit
 from .user_service import UserService
 from .permission_service import PermissionService
 from app.schema.user_permission_schema import (
@@ -50,6 +52,7 @@ class UserPermissionService:
             })
 
         await self.repository.bulk_insert(user_permissions_to_add)
+        await publish("user_permission", user.id)
         return assigned_permissions
 
     async def set_permission(self, user: User, permissions: list[Permission]) -> list:
@@ -69,6 +72,7 @@ class UserPermissionService:
             user_permissions.append(user_permission)
 
         await self.repository.bulk_insert(user_permissions)
+        await publish("user_permission", user.id)
         return user_permissions
 
     async def find_permissions_by_user(self, user: User) -> list[UserPermission]:
@@ -126,6 +130,7 @@ class UserPermissionService:
             updated_permissions.append(user_permission)
 
         await self.repository.bulk_update(updated_permissions)
+        await publish("user_permission", user.id)
         return [{"permission_id": up.permission_id, "status": "updated"} for up in updated_permissions]
 
     async def delete_permissions(self, data: UserPermissionsDelete) -> None:
@@ -156,7 +161,10 @@ class UserPermissionService:
         
         # Thực hiện xóa hàng loạt
         failed_deletes = await self.repository.bulk_delete(user_permissions_to_delete)
+        await publish("user_permission", user.id)
         if failed_deletes:
+            # Giữ lại các bản ghi đã xóa thành công (và NOTIFY) dù request trả về lỗi
+            await commit()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Không thể thu hồi quyền với id: {', '.join(str(up.id) for up in failed_deletes)}"
@@ -1,11 +1,28 @@
 from fastapi import HTTPException, status
 from app.repository.user_repository import UserRepository
-from app.schema.user_schema import UserCreate, UserUpdate
+from app.schema.user_schema import UserCreate, UserUpdate, UserSnapshot
 from app.model.user import User
-from passlib.context import CryptContext
 from app.core.exceptions import DuplicateDataError
+from app.core.password import password_hasher
+from app.core.cache import TTLCache
+from app.core.config import USER_CACHE_SIZE, USER_CACHE_TTL
+from app.core.invalidation import subscribe, publish
+from app.core.pagination import decode_cursor, check_page_depth, split_page
+from app.core.permission_scope import PermissionScope
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Snapshot của các user đã xác thực, key là user id
+user_snapshot_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+def _on_user_changed(user_id: int | None, data: dict):
+    if user_id is None:
+        user_snapshot_cache.clear()
+    else:
+        user_snapshot_cache.pop(user_id)
+
+
+subscribe("user", _on_user_changed)
 
 
 class UserService:
@@ -13,9 +30,23 @@ class UserService:
     def __init__(self):
         self.repository = UserRepository()
 
-    async def get_active_users_paginated(self, page: int, limit: int):
-        """Lấy danh sách người dùng đang hoạt động theo phân trang"""
-        return await self.repository.get_active_users_paginated(page, limit)
+    async def get_active_users_paginated(
+        self,
+        page: int,
+        limit: int,
+        scope: PermissionScope | None = None,
+        cursor: str | None = None
+    ):
+        """
+        Lấy danh sách người dùng đang hoạt động theo phân trang, chỉ gồm các user nằm trong phạm vi quyền.
+        Phân trang theo cursor nếu có, ngược lại theo page (giới hạn độ sâu).
+        Trả về (danh sách user, cursor của trang sau hoặc None).
+        """
+        after = decode_cursor(cursor, int) if cursor else None
+        if after is None:
+            check_page_depth(page)
+        users = await self.repository.get_active_users_paginated(page, limit, scope, after)
+        return split_page(users, limit, lambda user: (user.id,))
 
     async def get_user_by_id(self, user_id: int):
         """Tìm người dùng theo ID (chỉ lấy user đang hoạt động)"""
@@ -24,6 +55,15 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return user
 
+    async def get_user_snapshot(self, user_id: int) -> UserSnapshot:
+        """Lấy snapshot (id, username, email, is_active) của user đang hoạt động, ưu tiên lấy từ cache"""
+        snapshot = user_snapshot_cache.get(user_id)
+        if snapshot is None:
+            user = await self.get_user_by_id(user_id)
+            snapshot = UserSnapshot.model_validate(user)
+            user_snapshot_cache.set(user_id, snapshot)
+        return snapshot
+
     async def get_user_by_username(self, username: str):
         """Tìm người dùng theo username (chỉ lấy user đang hoạt động)"""
         user = await self.repository.get_user_by_username(username)
@@ -40,7 +80,7 @@ class UserService:
 
     async def create_superadmin(self, password: str):
         """Tạo superadmin"""
-        hashed_password = pwd_context.hash(password)
+        hashed_password = await password_hasher.hash(password)
         new_user = User(username="superadmin", password=hashed_password)
         try:
             superadmin = await self.repository.create_user(new_user)
@@ -52,8 +92,9 @@ class UserService:
         """Thay đổi mật khẩu superadmin"""
         try:
             user = await self.get_user_by_username("superadmin")
-            user.password = pwd_context.hash(new_password)
+            user.password = await password_hasher.hash(new_password)
             await self.repository.update_user(user)
+            await publish("user", user.id)
             return True
         except Exception:
             return False
@@ -68,7 +109,7 @@ class UserService:
                 detail="Cannot create user with username: superadmin, admin"
             )
         # Hash mật khẩu trước khi tạo instance của User
-        data["password"] = pwd_context.hash(data["password"])
+        data["password"] = await password_hasher.hash(data["password"])
         # Sử dụng dictionary unpacking để map dữ liệu
         new_user = User(**data)
         try:
@@ -94,12 +135,14 @@ class UserService:
                 )
         # Nếu có cập nhật password thì hash lại mật khẩu
         if "password" in update_data:
-            update_data["password"] = pwd_context.hash(update_data["password"])
+            update_data["password"] = await password_hasher.hash(update_data["password"])
 
         # Cập nhật các trường có trong update_data vào instance User hiện tại
         for key, value in update_data.items():
             setattr(user, key, value)
-        return await self.repository.update_user(user)
+        user = await self.repository.update_user(user)
+        await publish("user", user.id)
+        return user
 
     async def delete_user(self, user_id: int):
         """Xóa người dùng"""
@@ -109,24 +152,29 @@ class UserService:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Cannot delete superadmin"
             )
-        return await self.repository.delete_user(user)
+        success = await self.repository.delete_user(user)
+        await publish("user", user.id)
+        return success
 
     async def verify_user_password(self, username: str, password: str):
         """Kiểm tra mật khẩu đăng nhập"""
         user = await self.get_user_by_username(username)
-        if not pwd_context.verify(password, user.password):
+        if not await password_hasher.verify(password, user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="The password is incorrect"
             )
         return user
 
-    async def change_user_password(self, user: User, current_password: str, new_password: str):
+    async def change_user_password(self, user_id: int, current_password: str, new_password: str):
         """Thay đổi mật khẩu người dùng"""
-        if not pwd_context.verify(current_password, user.password):
+        user = await self.get_user_by_id(user_id)
+        if not await password_hasher.verify(current_password, user.password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect current password"
             )
-        user.password = pwd_context.hash(new_password)
-        return await self.repository.update_user(user)
+        user.password = await password_hasher.hash(new_password)
+        user = await self.repository.update_user(user)
+        await publish("user", user.id)
+        return user
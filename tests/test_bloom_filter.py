@@ -0,0 +1,55 @@
+import pytest
+from app.core import bloom_filter as bloom_module
+from app.core.bloom_filter import BloomFilter, ExpiringBloomFilter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [9000.0]
+    monkeypatch.setattr(bloom_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"token-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_item_is_dropped_after_its_window_expires(clock):
+    bloom = ExpiringBloomFilter(capacity=100, window=900)
+    bloom.add("a", expires_at=clock[0] + 100)
+    assert "a" in bloom
+    # Bucket chỉ bị bỏ khi đã qua hẳn cửa sổ chứa thời điểm hết hạn
+    clock[0] = (int((9000 + 100) // 900) + 1) * 900
+    assert "a" not in bloom
+    assert bloom.stats()["buckets"] == 0
+
+
+def test_item_is_kept_until_its_window_ends(clock):
+    bloom = ExpiringBloomFilter(capacity=100, window=900)
+    bloom.add("a", expires_at=clock[0] + 100)
+    clock[0] += 101
+    # Có thể còn dương tính sau khi hết hạn (trong cùng cửa sổ), không bao giờ âm tính giả trước đó
+    assert "a" in bloom
+
+
+def test_expired_item_is_not_added(clock):
+    bloom = ExpiringBloomFilter(capacity=100, window=900)
+    bloom.add("a", expires_at=clock[0] - 1)
+    assert "a" not in bloom
+    assert bloom.stats()["items"] == 0
+
+
+def test_rebuild_replaces_items_and_marks_loaded(clock):
+    bloom = ExpiringBloomFilter(capacity=100, window=900)
+    bloom.add("old", expires_at=clock[0] + 100)
+    bloom.rebuild([("new", clock[0] + 100), ("expired", clock[0] - 1)])
+    assert bloom.loaded
+    assert "new" in bloom
+    assert "old" not in bloom
+    assert bloom.stats()["items"] == 1
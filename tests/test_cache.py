@@ -0,0 +1,72 @@
+import pytest
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    clock[0] += 29
+    assert cache.get("a") == 1
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1, ttl=5)
+    clock[0] += 5
+    assert cache.get("a", "missing") == "missing"
+
+
+def test_zero_ttl_or_size_disables_cache(clock):
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("a", 1)
+    assert len(cache) == 0
+    cache = TTLCache(maxsize=0, ttl=30)
+    cache.set("a", 1)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_pop_and_clear_bump_generation(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    generation = cache.generation
+    cache.pop("a")
+    assert cache.get("a") is None
+    assert cache.generation == generation + 1
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.generation == generation + 2
+
+
+def test_stats_count_hits_and_misses(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["size"] == 1
@@ -0,0 +1,74 @@
+import base64
+import pytest
+from fastapi import HTTPException
+from app.core.config import MAX_PAGE_DEPTH
+from app.core.pagination import encode_cursor, decode_cursor, check_page_depth, split_page
+
+
+PRICE_CURSOR = ((str, type(None)), int)
+
+
+@pytest.mark.parametrize("values, types", [
+    ((1,), (int,)),
+    ((42, 7), (int, int)),
+    (("19.90", 3), PRICE_CURSOR),
+    ((None, 5), PRICE_CURSOR),
+])
+def test_cursor_round_trip(values, types):
+    cursor = encode_cursor(*values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, *types) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"{bad json").decode(),
+    base64.urlsafe_b64encode(b'{"id": 1}').decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, int)
+    assert error.value.status_code == 400
+
+
+def test_cursor_with_wrong_size_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor(1, 2), int)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("values, types", [
+    (("abc",), (int,)),
+    ((1.5,), (int,)),
+    ((True,), (int,)),
+    ((None,), (int,)),
+    ((2 ** 63,), (int,)),
+    (([1],), (int,)),
+    ((19.9, 3), PRICE_CURSOR),
+    (("19.90", "3"), PRICE_CURSOR),
+])
+def test_cursor_with_wrong_value_types_is_rejected(values, types):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor(*values), *types)
+    assert error.value.status_code == 400
+
+
+def test_page_depth_limit():
+    check_page_depth(MAX_PAGE_DEPTH)
+    with pytest.raises(HTTPException) as error:
+        check_page_depth(MAX_PAGE_DEPTH + 1)
+    assert error.value.status_code == 400
+
+
+def test_split_page_without_next_page():
+    rows, cursor = split_page([1, 2], 2, lambda row: (row,))
+    assert rows == [1, 2]
+    assert cursor is None
+
+
+def test_split_page_builds_cursor_from_last_row():
+    rows, cursor = split_page([1, 2, 3], 2, lambda row: (row,))
+    assert rows == [1, 2]
+    assert decode_cursor(cursor, int) == (2,)
@@ -0,0 +1,118 @@
+from sqlalchemy import column
+from app.core.permission_scope import PermissionScope
+from app.service.permission_table import PermissionTable
+
+
+DEFAULTS = {"view_products": True, "edit_product": False}
+
+
+def compile_table(user_grants=(), group_grants=()):
+    return PermissionTable.compile(DEFAULTS, list(user_grants), list(group_grants))
+
+
+def test_default_applies_without_grants():
+    table = compile_table()
+    assert table.get("view_products").check() is True
+    assert table.get("edit_product").check(5) is False
+
+
+def test_unknown_permission_returns_none():
+    assert compile_table().get("missing_permission") is None
+
+
+def test_user_deny_overrides_group_allow_and_default():
+    table = compile_table(
+        user_grants=[("view_products", None, True)],
+        group_grants=[(1, "view_products", None, False)],
+    )
+    assert table.get("view_products").check(7) is False
+
+
+def test_user_target_record_overrides_user_global_record():
+    table = compile_table(user_grants=[("edit_product", None, False), ("edit_product", 3, True)])
+    permission = table.get("edit_product")
+    assert permission.check(3) is False
+    assert permission.check(4) is True
+    assert permission.check() is True
+
+
+def test_first_duplicate_user_record_wins():
+    table = compile_table(user_grants=[("edit_product", 3, False), ("edit_product", 3, True)])
+    assert table.get("edit_product").check(3) is True
+
+
+def test_user_owned_resource_beats_group_and_default():
+    assert compile_table().get("edit_product").check(3, is_user_owned=True) is True
+    # Bản ghi của chính user vẫn được ưu tiên hơn tài nguyên thuộc về user
+    table = compile_table(user_grants=[("edit_product", 3, True)])
+    assert table.get("edit_product").check(3, is_user_owned=True) is False
+
+
+def test_group_target_allow():
+    table = compile_table(group_grants=[(1, "edit_product", 3, False)])
+    permission = table.get("edit_product")
+    assert permission.check(3) is True
+    assert permission.check(4) is False
+
+
+def test_group_target_deny_only_overrides_the_same_group():
+    # Nhóm 1 cho phép toàn cục nhưng từ chối target 3; nhóm 2 cũng cho phép toàn cục nên target 3 vẫn được phép
+    table = compile_table(group_grants=[
+        (1, "edit_product", None, False),
+        (1, "edit_product", 3, True),
+        (2, "edit_product", None, False),
+    ])
+    assert table.get("edit_product").check(3) is True
+
+    table = compile_table(group_grants=[
+        (1, "edit_product", None, False),
+        (1, "edit_product", 3, True),
+    ])
+    permission = table.get("edit_product")
+    assert permission.check(3) is False
+    assert permission.check(4) is True
+
+
+def test_group_deny_without_group_allow_falls_back_to_default():
+    table = compile_table(group_grants=[(1, "view_products", 3, True)])
+    assert table.get("view_products").check(3) is True
+
+
+def test_scope_matches_check_for_every_target():
+    table = compile_table(
+        user_grants=[("edit_product", 3, True)],
+        group_grants=[
+            (1, "edit_product", None, False),
+            (1, "edit_product", 5, True),
+            (2, "edit_product", 8, False),
+        ],
+    )
+    permission = table.get("edit_product")
+    scope = permission.scope()
+    assert scope.allow_all is True
+    assert scope.target_ids == frozenset({3, 5})
+    for target_id in range(1, 10):
+        assert scope.allows(target_id) == permission.check(target_id)
+
+
+def test_scope_of_target_only_grants():
+    scope = compile_table(user_grants=[("edit_product", 2, False), ("edit_product", 4, False)]).get("edit_product").scope()
+    assert scope.allow_all is False
+    assert scope.target_ids == frozenset({2, 4})
+    assert not scope.is_empty
+
+
+def test_empty_scope():
+    scope = compile_table().get("edit_product").scope()
+    assert scope.is_empty
+    assert not scope.allows(1)
+
+
+def test_scope_as_clause():
+    def sql(scope):
+        return str(scope.as_clause(column("id")).compile(compile_kwargs={"literal_binds": True}))
+
+    assert sql(PermissionScope(True)) == "true"
+    assert sql(PermissionScope(False)) == "false"
+    assert sql(PermissionScope(True, frozenset({3}))) == "(id NOT IN (3))"
+    assert sql(PermissionScope(False, frozenset({3}))) == "id IN (3)"
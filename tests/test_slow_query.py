@@ -0,0 +1,42 @@
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+from app.core.slow_query import SlowQueryLog, redact
+
+
+def test_redact_keeps_non_sensitive_scalars():
+    assert redact(None) is None
+    assert redact(True) is True
+    assert redact(42) == 42
+    assert redact(1.5) == 1.5
+    assert redact(Decimal("9.90")) == Decimal("9.90")
+    assert redact(date(2024, 1, 2)) == "2024-01-02"
+    assert redact(datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02T03:04:05"
+
+
+def test_redact_hides_strings_and_bytes():
+    assert redact("hunter2") == "<str len=7>"
+    assert redact(b"\x00\x01") == "<bytes len=2>"
+
+
+def test_redact_recurses_into_containers():
+    parameters = {"username": "admin", "ids": (1, 2), "meta": {"token": "abc"}}
+    assert redact(parameters) == {"username": "<str len=5>", "ids": [1, 2], "meta": {"token": "<str len=3>"}}
+
+
+def test_redact_hides_unknown_types():
+    assert redact(object()) == "<object>"
+
+
+def test_observe_only_queues_sampled_slow_queries():
+    log = SlowQueryLog(threshold_ms=100, sample_rate=1.0, queue_size=1, log_file=None)
+    # Chưa start: không làm gì
+    log.observe("SELECT 1", (), 1.0, "/")
+    log._queue = asyncio.Queue(maxsize=1)
+    log.observe("SELECT 1", (), 0.05, "/")
+    log.observe("EXPLAIN SELECT 1", (), 1.0, "/")
+    assert log._queue.empty()
+    log.observe("SELECT 1", ("secret",), 0.2, "/users")
+    log.observe("SELECT 2", (), 0.2, "/users")
+    assert log._queue.qsize() == 1
+    assert log.dropped == 1